@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Build script for the VexFS Qdrant adapter.
+
+The Cython fast path (_vexfs_client) is optional: when Cython is not
+installed, the pure-Python IOCTL marshalling in kernel_client.py is used
+instead and the package still works.
+"""
+
+from setuptools import setup, find_packages
+
+ext_modules = []
+try:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(
+        ['vexfs_qdrant/_vexfs_client.pyx'],
+        compiler_directives={'language_level': '3'},
+    )
+except ImportError:
+    pass
+
+setup(
+    name='vexfs-qdrant-adapter',
+    version='0.0.4a0',
+    description='Qdrant-compatible Python adapter for VexFS v2',
+    packages=find_packages(exclude=['tests']),
+    ext_modules=ext_modules,
+    python_requires='>=3.8',
+    install_requires=['numpy>=1.20'],
+    extras_require={
+        'fast': ['Cython>=0.29'],
+        'grpc': ['grpcio>=1.44', 'protobuf>=3.20', 'qdrant-client>=1.1'],
+    },
+)
@@ -0,0 +1,452 @@
+"""
+Tests for the filter engine, parser and executor.
+
+Runs against simulated point metadata, so no mounted VexFS volume is needed.
+"""
+
+import pytest
+
+from vexfs_qdrant import kernel_client
+from vexfs_qdrant.filter_executor import (
+    FilterEngine,
+    create_boolean_filter,
+    create_geo_filter,
+    create_id_filter,
+    create_match_filter,
+    create_range_filter,
+)
+from vexfs_qdrant.filter_parser import FilterError, FilterParser
+from vexfs_qdrant.filter_program import compile_program
+from vexfs_qdrant.kernel_client import VexFSKernelClient
+from vexfs_qdrant.metadata_filters import FilterExecutor
+from vexfs_qdrant.pointset import LazyStringRange, PointIdSet
+
+
+@pytest.fixture
+def engine(monkeypatch, tmp_path):
+    backing = tmp_path / 'vectors.vex'
+    backing.write_bytes(b'')
+    monkeypatch.setattr(kernel_client.fcntl, 'ioctl',
+                        lambda fd, cmd, arg=0, mutate_flag=True: 0)
+    client = VexFSKernelClient(str(backing))
+    client.create_collection('docs', 4)
+    client._collections['docs'].vector_count = 200
+    yield FilterEngine(client)
+    client.close()
+
+
+class TestPointIdSet:
+    def test_bitmap_algebra(self):
+        a = PointIdSet.from_ids(['1', '2', '3'])
+        b = PointIdSet.from_ids(['2', '3', '4'])
+        assert sorted((a & b).to_string_list()) == ['2', '3']
+        assert sorted((a | b).to_string_list()) == ['1', '2', '3', '4']
+        assert (a - b).to_string_list() == ['1']
+
+    def test_from_range_is_dense(self):
+        s = PointIdSet.from_range(1000)
+        assert len(s) == 1000
+        assert '999' in s
+        assert '1000' not in s
+
+    def test_full_set_to_string_list_is_lazy(self):
+        view = PointIdSet.from_range(100).to_string_list()
+        assert isinstance(view, LazyStringRange)
+        assert len(view) == 100
+        assert view[99] == '99'
+        assert '50' in view and '100' not in view
+        assert view == [str(i) for i in range(100)]
+
+    def test_complement_avoids_universe(self):
+        s = PointIdSet.from_ids(['1', '3'])
+        assert sorted(s.complement(5).to_string_list()) == ['0', '2', '4']
+        assert sorted(PointIdSet(fallback={'abc', '2'}).complement(4)
+                      .to_string_list()) == ['0', '1', '3']
+
+    def test_numeric_fallback_promotes_to_bitmap(self):
+        a = PointIdSet(fallback={'1', '2', '3'})
+        b = PointIdSet.from_ids(['2', '3', '4'])
+        a &= b
+        assert a._mask is not None
+        assert sorted(a.to_string_list()) == ['2', '3']
+
+    def test_fallback_for_non_numeric_ids(self):
+        a = PointIdSet.from_ids(['abc', 'def'])
+        b = PointIdSet.from_ids(['def', 'ghi'])
+        assert (a & b).to_string_list() == ['def']
+
+
+class TestParser:
+    def test_parse_match_and_range(self):
+        parser = FilterParser()
+        parsed = parser.parse_filter(create_match_filter('category', 'books'))
+        assert parsed['type'] == 'match'
+        parsed = parser.parse_filter(create_range_filter('price', gte=1, lte=5))
+        assert parsed['type'] == 'range'
+        assert parsed['bounds'] == {'gte': 1, 'lte': 5}
+
+    def test_parse_boolean_nests(self):
+        parser = FilterParser()
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[create_match_filter('category', 'books')],
+            must_not=[create_range_filter('price', gt=100)]))
+        assert parsed['type'] == 'boolean'
+        assert len(parsed['must']) == 1
+        assert len(parsed['must_not']) == 1
+
+    def test_malformed_filters_rejected(self):
+        parser = FilterParser()
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x'})  # no operator
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'between': [1, 2]})
+        with pytest.raises(FilterError):
+            parser.parse_filter({'has_id': 'not-a-list'})
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'range': {'gte': 'high'}})
+
+    def test_match_any_and_except_variants(self):
+        parser = FilterParser()
+        # MatchAny lowers to an OR of plain matches.
+        parsed = parser.parse_filter(
+            {'key': 'category', 'match': {'any': ['books', 'games']}})
+        assert parsed['type'] == 'boolean'
+        assert [c['value'] for c in parsed['should']] == ['books', 'games']
+        # A single-value any collapses to its match child; an empty any
+        # can never match.
+        assert parser.parse_filter(
+            {'key': 'category', 'match': {'any': ['books']}}
+        )['type'] == 'match'
+        assert parser.parse_filter(
+            {'key': 'category', 'match': {'any': []}}
+        )['type'] == 'always_false'
+        # MatchExcept lowers to a must_not; an empty except excludes
+        # nothing.
+        parsed = parser.parse_filter(
+            {'key': 'category', 'match': {'except': ['books']}})
+        assert parsed['type'] == 'boolean'
+        assert [c['value'] for c in parsed['must_not']] == ['books']
+        assert parser.parse_filter(
+            {'key': 'category', 'match': {'except': []}}
+        )['type'] == 'always_true'
+
+    def test_malformed_match_variants_rejected(self):
+        parser = FilterParser()
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'match': {}})
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'match': {'text': 'books'}})
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'match': {'any': 'books'}})
+        with pytest.raises(FilterError):
+            parser.parse_filter({'key': 'x', 'match': {'except': 'books'}})
+
+    def test_simplification_folds_boolean_trees(self):
+        parser = FilterParser()
+        # Nested pure-AND flattens; duplicate clauses deduplicate.
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[create_match_filter('category', 'books'),
+                  create_boolean_filter(
+                      must=[create_range_filter('price', gte=1),
+                            create_match_filter('category', 'books')])]))
+        assert parsed['type'] == 'boolean'
+        assert [child['type'] for child in parsed['must']] == ['match',
+                                                               'range']
+        # AND-ed ranges on one field merge; empty intervals fold to false.
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[create_range_filter('price', gt=10),
+                  create_range_filter('price', lt=5)]))
+        assert parsed['type'] == 'always_false'
+        # Singleton must collapses to its child.
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[create_match_filter('category', 'books')]))
+        assert parsed['type'] == 'match'
+        # A single empty-interval range and an empty has_id fold to false;
+        # an empty boolean node is a tautology.
+        assert parser.parse_filter(
+            {'key': 'price', 'range': {'gt': 10, 'lt': 5}}
+        )['type'] == 'always_false'
+        assert parser.parse_filter({'has_id': []})['type'] == 'always_false'
+        assert parser.parse_filter({'must': []})['type'] == 'always_true'
+        # An always_true must child is dropped; the rest survives.
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[{'must': []}, create_match_filter('category', 'books')]))
+        assert parsed['type'] == 'match'
+
+    def test_always_true_returns_all_points(self, engine):
+        condition = create_boolean_filter(
+            should=[{'must': []},
+                    create_match_filter('category', 'books')])
+        assert len(engine.apply_filter('docs', condition)) == 200
+
+    def test_compiled_program_matches_interpreter(self, engine):
+        condition = create_boolean_filter(
+            must=[create_range_filter('price', gte=100, lt=800)],
+            should=[create_match_filter('category', 'books'),
+                    create_match_filter('tags', 'sports')],
+            must_not=[create_match_filter('category', 'food')])
+        parsed = engine.parser.parse_filter(condition)
+        program = compile_program(parsed)
+        assert program.ops.dtype.name == 'int8'
+        assert len(program) >= 4
+        executor = engine.executor
+        for index in range(200):
+            metadata = executor._get_point_metadata('docs', str(index))
+            assert program.matches(metadata) == \
+                executor._matches(parsed, metadata)
+
+    def test_nested_has_id_under_boolean(self, engine):
+        condition = create_boolean_filter(
+            must=[create_id_filter([1, 2, 3, 50, 51]),
+                  create_match_filter('category', 'electronics')])
+        parsed = engine.parser.parse_filter(condition)
+        executor = engine.executor
+        program = compile_program(parsed)
+        expected = {
+            pid for pid in (str(index) for index in range(200))
+            if program.matches(executor._get_point_metadata('docs', pid),
+                               pid)}
+        assert set(executor.execute_filter('docs', parsed)) == expected
+        assert set(engine.apply_filter('docs', condition)) == expected
+        assert expected <= {'1', '2', '3', '50', '51'}
+
+    def test_batch_path_matches_plan_for_nested_has_id(self, engine):
+        condition = create_boolean_filter(
+            must=[create_id_filter(range(40)),
+                  create_match_filter('category', 'electronics')])
+        parsed = engine.parser.parse_filter(condition)
+        batch = engine.executor.execute_filters_batch('docs', [parsed])[0]
+        assert set(batch) == set(engine.apply_filter('docs', condition))
+        assert len(batch) > 0
+
+    def test_must_clauses_sorted_by_cost(self):
+        parser = FilterParser()
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[{'key': 'location',
+                   'geo_radius': {'center': {'lat': 0.0, 'lon': 0.0},
+                                  'radius': 1000.0}},
+                  create_range_filter('price', gte=1),
+                  create_match_filter('category', 'books')]))
+        assert [child['type'] for child in parsed['must']] == [
+            'match', 'range', 'geo_radius']
+        assert all(0.0 <= child['selectivity'] <= 1.0
+                   for child in parsed['must'])
+
+    def test_always_false_short_circuits(self, engine):
+        condition = create_boolean_filter(
+            must=[create_range_filter('price', gt=10),
+                  create_range_filter('price', lt=5)])
+        assert engine.apply_filter('docs', condition) == []
+        assert engine.count_filter('docs', condition) == 0
+
+    def test_complexity_and_fields(self):
+        parser = FilterParser()
+        parsed = parser.parse_filter(create_boolean_filter(
+            must=[create_range_filter('price', gte=1),
+                  create_geo_filter('location', 0.0, 0.0, 1000.0)]))
+        assert parser.estimate_filter_complexity(parsed) == 8
+        assert parser.get_filter_fields(parsed) == {'price', 'location'}
+        # Annotations are produced by the parse pass itself, so every
+        # child node carries them too — no separate analysis walk.
+        for child in parsed['must']:
+            assert 'complexity' in child and 'fields' in child
+
+
+class TestEngine:
+    def test_empty_filter_returns_all_points(self, engine):
+        assert len(engine.apply_filter('docs', None)) == 200
+
+    def test_match_filter_selects_consistent_subset(self, engine):
+        matches = engine.apply_filter(
+            'docs', create_match_filter('category', 'books'))
+        assert 0 < len(matches) < 200
+        # Deterministic metadata: same query, same result.
+        assert matches == engine.apply_filter(
+            'docs', create_match_filter('category', 'books'))
+
+    def test_must_is_intersection(self, engine):
+        cat = set(engine.apply_filter(
+            'docs', create_match_filter('category', 'books')))
+        price = set(engine.apply_filter(
+            'docs', create_range_filter('price', lte=500.0)))
+        both = set(engine.apply_filter('docs', create_boolean_filter(
+            must=[create_match_filter('category', 'books'),
+                  create_range_filter('price', lte=500.0)])))
+        assert both == cat & price
+
+    def test_must_not_is_difference(self, engine):
+        cat = set(engine.apply_filter(
+            'docs', create_match_filter('category', 'books')))
+        rest = set(engine.apply_filter('docs', create_boolean_filter(
+            must_not=[create_match_filter('category', 'books')])))
+        assert rest == {str(i) for i in range(200)} - cat
+
+    def test_should_is_union(self, engine):
+        a = set(engine.apply_filter(
+            'docs', create_match_filter('category', 'books')))
+        b = set(engine.apply_filter(
+            'docs', create_match_filter('category', 'food')))
+        union = set(engine.apply_filter('docs', create_boolean_filter(
+            should=[create_match_filter('category', 'books'),
+                    create_match_filter('category', 'food')])))
+        assert union == a | b
+
+    def test_has_id_restricts_to_existing(self, engine):
+        matches = engine.apply_filter('docs',
+                                      create_id_filter([1, 2, 999]))
+        assert sorted(matches) == ['1', '2']
+
+    def test_candidate_subset_respected(self, engine):
+        matches = engine.apply_filter(
+            'docs', create_range_filter('price', gte=0.0),
+            point_ids=['1', '2', '3'])
+        assert set(matches) <= {'1', '2', '3'}
+
+    def test_geo_bounding_box_filter(self, engine):
+        condition = {'key': 'location',
+                     'geo_bounding_box': {
+                         'top_left': {'lat': 60.0, 'lon': -30.0},
+                         'bottom_right': {'lat': -60.0, 'lon': 90.0}}}
+        matches = engine.apply_filter('docs', condition)
+        assert 0 < len(matches) < 200
+        all_ids = [str(i) for i in range(200)]
+        assert (set(matches) ==
+                set(engine.apply_filter('docs', condition,
+                                        point_ids=all_ids)))
+
+    def test_vectorized_geo_matches_per_point_path(self, engine):
+        condition = create_geo_filter('location', 10.0, 20.0, 3_000_000.0)
+        all_ids = [str(i) for i in range(200)]
+        assert (set(engine.apply_filter('docs', condition)) ==
+                set(engine.apply_filter('docs', condition,
+                                        point_ids=all_ids)))
+
+    def test_small_radius_equirect_agrees_with_scalar(self, engine):
+        executor = engine.executor
+        # Center on a known point so the sub-100km fast path has matches.
+        center = executor._get_point_metadata('docs', '7')['location']
+        condition = create_geo_filter('location', center['lat'],
+                                      center['lon'], 80_000.0)
+        parsed = engine.parser.parse_filter(condition)
+        dense = set(executor.execute_filter('docs', parsed).to_string_list())
+        scalar = {str(i) for i in range(200)
+                  if executor._matches(
+                      parsed, executor._get_point_metadata('docs', str(i)))}
+        assert dense == scalar
+        assert '7' in dense
+
+    def test_high_latitude_large_radius_agrees_with_scalar(self, engine):
+        executor = engine.executor
+        # A 5,000 km circle at lat 64.95° reaches longitude deltas wider
+        # than angular/cos(lat); the old prefilter dropped matches near
+        # its east/west extremes.
+        condition = create_geo_filter('location', 64.95, 20.0, 5_000_000.0)
+        parsed = engine.parser.parse_filter(condition)
+        dense = set(executor.execute_filter('docs', parsed).to_string_list())
+        scalar = {str(i) for i in range(200)
+                  if executor._matches(
+                      parsed, executor._get_point_metadata('docs', str(i)))}
+        assert dense == scalar
+        assert dense
+
+    def test_vectorized_range_matches_per_point_path(self, engine):
+        condition = create_range_filter('price', gte=100.0, lt=800.0)
+        all_ids = [str(i) for i in range(200)]
+        # point_ids forces the per-point path; no point_ids takes the column
+        # fast path. Both must agree.
+        assert (set(engine.apply_filter('docs', condition)) ==
+                set(engine.apply_filter('docs', condition,
+                                        point_ids=all_ids)))
+
+    def test_compiled_predicate_matches_interpreter(self, engine):
+        condition = create_boolean_filter(
+            must=[create_match_filter('category', 'books'),
+                  create_range_filter('price', gte=50.0)])
+        compiled = engine.compile_filter(condition)
+        parsed = engine.parser.parse_filter(condition)
+        for pid in ('0', '7', '42', '199'):
+            metadata = engine.executor._get_point_metadata('docs', pid)
+            assert compiled(metadata) == engine.executor._matches(parsed,
+                                                                  metadata)
+        with pytest.raises(FilterError):
+            engine.compile_filter(create_id_filter([1, 2]))
+
+    def test_count_filter_matches_apply_filter(self, engine):
+        condition = create_match_filter('category', 'books')
+        assert engine.count_filter('docs', condition) == \
+            len(engine.apply_filter('docs', condition))
+        assert engine.count_filter('docs', None) == 200
+
+    def test_min_should_match_tally(self, engine):
+        clauses = [create_match_filter('category', 'books'),
+                   create_range_filter('price', lte=500.0),
+                   create_range_filter('rating', gte=2.5)]
+        singles = [set(engine.apply_filter('docs', c)) for c in clauses]
+        condition = create_boolean_filter(should=clauses, min_should_match=2)
+        expected = {str(i) for i in range(200)
+                    if sum(str(i) in s for s in singles) >= 2}
+        assert set(engine.apply_filter('docs', condition)) == expected
+        all_ids = [str(i) for i in range(200)]
+        assert set(engine.apply_filter('docs', condition,
+                                       point_ids=all_ids)) == expected
+        with pytest.raises(FilterError):
+            engine.parser.parse_filter(
+                create_boolean_filter(should=clauses, min_should_match=0))
+
+    def test_quantized_range_matches_interpreter(self, engine):
+        ints, scale = engine.executor.get_quantized_column('docs', 'price')
+        assert scale == 100 and str(ints.dtype) == 'int32'
+        # Fractional bounds off the 2-decimal grid must round the right way.
+        condition = create_boolean_filter(
+            must=[create_range_filter('price', gte=100.005, lt=799.995)])
+        all_ids = [str(i) for i in range(200)]
+        assert (set(engine.apply_filter('docs', condition)) ==
+                set(engine.apply_filter('docs', condition,
+                                        point_ids=all_ids)))
+
+    def test_signature_prefilter_is_exact(self, engine):
+        executor = engine.executor
+        signatures = executor.get_signature_column('docs', 'tags')
+        assert signatures is not None
+        parsed = engine.parser.parse_filter(create_match_filter('tags',
+                                                                'books'))
+        candidates = [str(i) for i in range(200)]
+        exact = {pid for pid in candidates
+                 if 'books' in executor._get_point_metadata('docs',
+                                                            pid)['tags']}
+        assert set(executor._scan_candidates('docs', parsed,
+                                             candidates)) == exact
+
+    def test_batch_execution_matches_individual(self, engine):
+        conditions = [create_match_filter('category', 'books'),
+                      create_range_filter('price', lte=500.0)]
+        parsed = [engine.parser.parse_filter(c) for c in conditions]
+        batched = engine.executor.execute_filters_batch('docs', parsed)
+        for condition, result in zip(conditions, batched):
+            assert (set(result.to_string_list()) ==
+                    set(engine.apply_filter('docs', condition)))
+
+    def test_stats_track_calls(self, engine):
+        engine.apply_filter('docs', None)
+        with pytest.raises(FilterError):
+            engine.apply_filter('docs', {'key': 'x'})
+        stats = engine.get_filter_statistics()
+        assert stats['total_filters'] == 2
+        assert stats['successful_filters'] == 1
+        assert stats['failed_filters'] == 1
+
+    def test_metadata_cache_byte_budget(self, engine):
+        executor = FilterExecutor(engine.client, metadata_cache_bytes=4096)
+        for pid in range(200):
+            executor._get_point_metadata('docs', str(pid))
+        cache = executor._metadata_cache
+        assert cache.bytes_used <= 4096
+        assert 0 < len(cache) < 200
+        stats = executor.get_cache_stats()
+        assert stats['metadata_cache_bytes'] == cache.bytes_used
+        assert stats['metadata_cache_max_bytes'] == 4096
+
+    def test_validate_filter(self, engine):
+        report = engine.validate_filter(create_match_filter('category', 'x'))
+        assert report['valid'] and report['fields'] == ['category']
+        assert not engine.validate_filter({'key': 'x'})['valid']
@@ -0,0 +1,175 @@
+"""
+Tests for the gRPC streaming service.
+
+Protobuf-dependent handlers only run when the optional grpc extra
+(grpcio, qdrant-client) is installed; the pure-Python helpers and the
+missing-dependency error path run everywhere.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from vexfs_qdrant import grpc_service, kernel_client
+from vexfs_qdrant.grpc_service import (
+    QdrantStreamingService,
+    _convert_point_id,
+    get_memory_usage_mb,
+)
+from vexfs_qdrant.kernel_client import VexFSError, VexFSKernelClient
+
+needs_grpc = pytest.mark.skipif(
+    grpc_service.qdrant_pb2 is None,
+    reason="grpc extra (grpcio, qdrant-client) not installed")
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    backing = tmp_path / 'vectors.vex'
+    backing.write_bytes(b'')
+    monkeypatch.setattr(kernel_client.fcntl, 'ioctl',
+                        lambda fd, cmd, arg=0, mutate_flag=True: 0)
+    client = VexFSKernelClient(str(backing))
+    client.create_collection('streamed', dimensions=4)
+    yield client
+    client.close()
+
+
+def _drain(agen):
+    """Collect every item yielded by an async generator."""
+    async def collect():
+        return [item async for item in agen]
+    return asyncio.run(collect())
+
+
+def test_convert_point_id_integers():
+    assert _convert_point_id(7) == 7
+    assert _convert_point_id('42') == 42
+
+
+def test_convert_point_id_uuid_matches_insert_path():
+    uid = '550e8400-e29b-41d4-a716-446655440000'
+    assert _convert_point_id(uid) == kernel_client._hash_point_id(uid)
+    assert 0 <= _convert_point_id(uid) < 2 ** 63
+
+
+def test_memory_usage_is_positive():
+    assert get_memory_usage_mb() > 0
+
+
+def test_point_data_entries_flow_through_insert(client):
+    points = [
+        grpc_service._PointData(
+            id=i, vector=np.asarray([float(i), 0.0, 0.0, 0.0],
+                                    dtype=np.float32))
+        for i in range(3)
+    ]
+    assert client.insert_points('streamed', points) == 3
+
+
+def test_service_requires_grpc_extra(client):
+    if grpc_service.qdrant_pb2 is not None:
+        pytest.skip('grpc extra installed')
+    with pytest.raises(VexFSError):
+        QdrantStreamingService(client)
+
+
+def _upsert_request(ids, name='streamed', dim=4):
+    request = grpc_service.qdrant_pb2.UpsertPoints(collection_name=name)
+    for i in ids:
+        point = request.points.add()
+        point.id.num = i
+        point.vectors.vector.data.extend([float(i)] + [0.0] * (dim - 1))
+    return request
+
+
+@needs_grpc
+def test_stream_upsert_flushes_at_watermark(client, monkeypatch):
+    service = QdrantStreamingService(client, upsert_watermark=4)
+    batches = []
+    insert = client.insert_points
+    monkeypatch.setattr(
+        client, 'insert_points',
+        lambda name, points: batches.append(len(points)) or
+        insert(name, points))
+
+    async def requests():
+        for start in range(0, 9, 3):
+            yield _upsert_request(range(start, start + 3))
+
+    total = asyncio.run(service.stream_upsert_points(requests()))
+    # 3 + 3 crosses the watermark and flushes as one batch; the stream
+    # end flushes the remainder.
+    assert batches == [6, 3]
+    assert total == 9
+
+
+@needs_grpc
+def test_stream_upsert_flushes_idle_stream(client, monkeypatch):
+    service = QdrantStreamingService(client, upsert_watermark=100)
+    batches = []
+    insert = client.insert_points
+    monkeypatch.setattr(
+        client, 'insert_points',
+        lambda name, points: batches.append(len(points)) or
+        insert(name, points))
+
+    async def requests():
+        yield _upsert_request(range(3))
+        # Go idle for longer than the fill window: the buffered points
+        # must flush, and the pull the window timed out on must still
+        # deliver this second request.
+        await asyncio.sleep(grpc_service._UPSERT_FILL_WINDOW_S * 5)
+        yield _upsert_request(range(3, 6))
+
+    total = asyncio.run(service.stream_upsert_points(requests()))
+    assert batches == [3, 3]
+    assert total == 6
+
+
+@needs_grpc
+def test_stream_scroll_pages_with_cursor(client):
+    client.insert_points('streamed', [
+        {'id': i, 'vector': [float(i), 0.0, 0.0, 0.0]} for i in range(10)])
+    service = QdrantStreamingService(client, batch_size=4)
+
+    async def collect():
+        # The response message is reused across yields, so page contents
+        # are copied out inside the loop rather than drained afterwards.
+        pages = []
+        async for response in service.stream_scroll_points('streamed'):
+            pages.append((
+                [p.id.num for p in response.result],
+                response.next_page_offset.num
+                if response.HasField('next_page_offset') else None))
+        return pages
+
+    pages = asyncio.run(collect())
+    assert [pid for ids, _ in pages for pid in ids] == list(range(10))
+    assert pages[0] == ([0, 1, 2, 3], 4)
+    assert pages[-1][1] is None
+
+
+@needs_grpc
+def test_stream_get_points_skips_empty_payloads(client):
+    service = QdrantStreamingService(client, batch_size=8)
+    responses = _drain(service.stream_get_points('streamed', list(range(5))))
+    points = [p for r in responses for p in r.result]
+    assert [p.id.num for p in points] == list(range(5))
+    for point in points:
+        assert not point.HasField('payload')
+
+
+@needs_grpc
+def test_stream_search_batches(client):
+    client.insert_points('streamed', [
+        {'id': i, 'vector': [float(i), 0.0, 0.0, 0.0]} for i in range(10)
+    ])
+    service = QdrantStreamingService(client, batch_size=4)
+    responses = _drain(service.stream_search_results(
+        'streamed', [1.0, 0.0, 0.0, 0.0], limit=10))
+    assert sum(len(r.result) for r in responses) <= 10
+    for response in responses:
+        for point in response.result:
+            assert point.id.num >= 0
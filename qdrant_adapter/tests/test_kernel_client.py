@@ -0,0 +1,277 @@
+"""
+Unit tests for the VexFS kernel client.
+
+These tests run without a mounted VexFS volume: the IOCTL layer is faked via
+monkeypatching so the marshalling and fallback logic can be exercised on any
+host.
+"""
+
+import errno
+import os
+import struct
+import tempfile
+
+import pytest
+
+from vexfs_qdrant import kernel_client
+from vexfs_qdrant.kernel_client import (
+    VexFSError,
+    VexFSKernelClient,
+    float_to_ieee754_bits,
+    get_vexfs_distance_type,
+    prepare_batch_vectors_for_kernel,
+)
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    """Client backed by a plain temp file with SET_VECTOR_META faked out."""
+    backing = tmp_path / 'vectors.vex'
+    backing.write_bytes(b'')
+    monkeypatch.setattr(kernel_client.fcntl, 'ioctl',
+                        lambda fd, cmd, arg=0, mutate_flag=True: 0)
+    c = VexFSKernelClient(str(backing))
+    yield c
+    c.close()
+
+
+class TestHelpers:
+    def test_ieee754_roundtrip(self):
+        for value in (0.0, 1.0, -2.5, 3.14159):
+            bits = float_to_ieee754_bits(value)
+            back = struct.unpack('<f', struct.pack('<I', bits))[0]
+            assert back == pytest.approx(value, rel=1e-6)
+
+    def test_prepare_batch_vectors_flattens_row_major(self):
+        bits = prepare_batch_vectors_for_kernel([[1.0, 2.0], [3.0, 4.0]])
+        assert len(bits) == 4
+        assert bits[0] == float_to_ieee754_bits(1.0)
+        assert bits[3] == float_to_ieee754_bits(4.0)
+
+    def test_point_id_hash_is_stable_and_positive(self):
+        # Unlike builtin hash(), the ID hash must not vary across processes;
+        # the blake2b fallback value below pins the mapping.
+        h = kernel_client._hash_point_id('point-abc')
+        assert h == kernel_client._hash_point_id('point-abc')
+        assert 0 <= h < 2 ** 63
+        assert h != kernel_client._hash_point_id('point-abd')
+
+    def test_distance_types(self):
+        assert get_vexfs_distance_type('euclidean') == 0
+        assert get_vexfs_distance_type('Cosine') == 1
+        assert get_vexfs_distance_type('dot') == 2
+        with pytest.raises(VexFSError):
+            get_vexfs_distance_type('hamming')
+
+
+class TestCollections:
+    def test_create_and_duplicate(self, client):
+        info = client.create_collection('docs', 4)
+        assert info.dimensions == 4
+        with pytest.raises(VexFSError):
+            client.create_collection('docs', 4)
+
+    def test_unknown_collection_rejected(self, client):
+        with pytest.raises(VexFSError):
+            client.insert_points('missing', [{'vector': [0.0]}])
+        with pytest.raises(VexFSError):
+            client.search_vectors('missing', [0.0])
+
+    def test_resolve_returns_usable_integer_id(self, client):
+        client.create_collection('docs', 2)
+        cid = client.resolve('docs')
+        client.insert_points(cid, [{'id': 1, 'vector': [1.0, 0.0]}])
+        assert client._collections['docs'].vector_count == 1
+        with pytest.raises(VexFSError):
+            client.resolve('missing')
+        client.delete_collection('docs')
+        with pytest.raises(VexFSError):
+            client.insert_points(cid, [{'id': 2, 'vector': [0.0, 1.0]}])
+
+    def test_dimension_mismatch_rejected(self, client):
+        client.create_collection('docs', 4)
+        with pytest.raises(VexFSError):
+            client.insert_points('docs', [{'id': 1, 'vector': [1.0, 2.0]}])
+        with pytest.raises(VexFSError):
+            client.search_vectors('docs', [1.0, 2.0])
+
+    def test_malformed_batches_rejected(self, client):
+        client.create_collection('docs', 2)
+        with pytest.raises(VexFSError):  # ragged
+            client.insert_points('docs', [{'vector': [1.0, 2.0]},
+                                          {'vector': [1.0]}])
+        with pytest.raises(VexFSError):  # non-numeric
+            client.insert_points('docs', [{'vector': ['a', 'b']}])
+
+
+class TestStagingRing:
+    def _arm_ring(self, client):
+        import mmap as mmap_mod
+        client._ring = mmap_mod.mmap(-1, kernel_client.VEXFS_STAGING_RING_SIZE)
+        client._ring_supported = None
+
+    def test_ring_insert_single_ioctl(self, client, monkeypatch):
+        client.create_collection('docs', 2)
+        self._arm_ring(client)
+        calls = []
+        monkeypatch.setattr(
+            kernel_client.fcntl, 'ioctl',
+            lambda fd, cmd, arg=0, mutate_flag=True: calls.append(cmd) or 0)
+        client.insert_points('docs', [{'id': 1, 'vector': [1.0, 2.0]}])
+        assert calls == [kernel_client.VEXFS_IOC_BATCH_INSERT_RING]
+        assert client._ring_supported is True
+        # Payload landed in the ring: two float32 bits then the 8-byte ID.
+        assert client._ring[:8] == \
+            struct.pack('<II', kernel_client.float_to_ieee754_bits(1.0),
+                        kernel_client.float_to_ieee754_bits(2.0))
+
+    def test_ring_enotty_falls_back_to_pointer_path(self, client, monkeypatch):
+        client.create_collection('docs', 2)
+        self._arm_ring(client)
+        calls = []
+
+        def fake_ioctl(fd, cmd, arg=0, mutate_flag=True):
+            calls.append(cmd)
+            if cmd == kernel_client.VEXFS_IOC_BATCH_INSERT_RING:
+                raise OSError(errno.ENOTTY, 'Inappropriate ioctl')
+            return 0
+
+        monkeypatch.setattr(kernel_client.fcntl, 'ioctl', fake_ioctl)
+        client.insert_points('docs', [{'id': 1, 'vector': [1.0, 2.0]}])
+        assert calls == [kernel_client.VEXFS_IOC_BATCH_INSERT_RING,
+                         kernel_client.VEXFS_IOC_BATCH_INSERT]
+        assert client._ring_supported is False
+        # Sticky: the next insert goes straight to the pointer path.
+        calls.clear()
+        client.insert_points('docs', [{'id': 2, 'vector': [3.0, 4.0]}])
+        assert calls == [kernel_client.VEXFS_IOC_BATCH_INSERT]
+
+
+class TestQuantizedInsert:
+    def test_int8_collection_inserts_quantized_payload(self, client, monkeypatch):
+        client.create_collection('q8', 2,
+                                 element_type=kernel_client.VEXFS_VECTOR_INT8)
+        calls = []
+        monkeypatch.setattr(
+            kernel_client.fcntl, 'ioctl',
+            lambda fd, cmd, arg=0, mutate_flag=True: calls.append(cmd) or 0)
+        inserted = client.insert_points(
+            'q8', [{'id': 1, 'vector': [1.0, -1.0]},
+                   {'id': 2, 'vector': [0.5, 0.25]}])
+        assert inserted == 2
+        assert calls == [kernel_client.VEXFS_IOC_BATCH_INSERT]
+        assert client._collections['q8'].vector_count == 2
+
+    def test_unknown_element_type_rejected(self, client):
+        with pytest.raises(VexFSError):
+            client.create_collection('bad', 2,
+                                     element_type=kernel_client.VEXFS_VECTOR_BINARY)
+
+
+class TestCoalescedInsert:
+    def test_queued_points_flush_in_one_batch(self, client, monkeypatch):
+        client.create_collection('docs', 2)
+        calls = []
+        monkeypatch.setattr(
+            kernel_client.fcntl, 'ioctl',
+            lambda fd, cmd, arg=0, mutate_flag=True: calls.append(cmd) or 0)
+        client.insert_points_coalesced('docs', [{'id': 1, 'vector': [1.0, 0.0]}])
+        client.insert_points_coalesced('docs', [{'id': 2, 'vector': [0.0, 1.0]}])
+        client.flush()
+        assert calls == [kernel_client.VEXFS_IOC_BATCH_INSERT]
+        assert client._collections['docs'].vector_count == 2
+
+    def test_flush_is_idempotent(self, client):
+        client.create_collection('docs', 2)
+        client.flush()
+        client.flush()
+
+    def test_unknown_collection_rejected(self, client):
+        with pytest.raises(VexFSError):
+            client.insert_points_coalesced('missing', [])
+
+
+class TestBatchSearch:
+    def test_enotty_falls_back_to_per_query_loop(self, client, monkeypatch):
+        client.create_collection('docs', 2)
+        calls = []
+
+        def fake_ioctl(fd, cmd, arg=0, mutate_flag=True):
+            calls.append(cmd)
+            if cmd == kernel_client.VEXFS_IOC_VECTOR_SEARCH_BATCH:
+                raise OSError(errno.ENOTTY, 'Inappropriate ioctl')
+            return 0
+
+        monkeypatch.setattr(kernel_client.fcntl, 'ioctl', fake_ioctl)
+        results = client.search_vectors_batch(
+            'docs', [[1.0, 0.0], [0.0, 1.0]], limit=3)
+        assert len(results) == 2
+        # One failed batch probe, then one single-query search per query.
+        assert calls[0] == kernel_client.VEXFS_IOC_VECTOR_SEARCH_BATCH
+        assert calls[1:] == [kernel_client.VEXFS_IOC_VECTOR_SEARCH] * 2
+        # The fallback decision is sticky: no second batch probe.
+        calls.clear()
+        client.search_vectors_batch('docs', [[1.0, 0.0]], limit=3)
+        assert calls == [kernel_client.VEXFS_IOC_VECTOR_SEARCH]
+
+    def test_async_search_resolves_off_thread(self, client, monkeypatch):
+        client.create_collection('docs', 2)
+        monkeypatch.setattr(kernel_client.fcntl, 'ioctl',
+                            lambda fd, cmd, arg=0, mutate_flag=True: 0)
+        futures = [client.search_vectors_async('docs', [1.0, 0.0], limit=5)
+                   for _ in range(4)]
+        for future in futures:
+            assert future.result(timeout=5) == []
+
+    def test_async_search_propagates_errors(self, client):
+        client.create_collection('docs', 2)
+        future = client.search_vectors_async('docs', [1.0])  # wrong dims
+        with pytest.raises(VexFSError):
+            future.result(timeout=5)
+
+    def test_ragged_batch_rejected(self, client):
+        client.create_collection('docs', 2)
+        with pytest.raises(VexFSError):
+            client.search_vectors_batch('docs', [[1.0, 0.0], [1.0]])
+
+    def test_empty_batch(self, client):
+        client.create_collection('docs', 2)
+        assert client.search_vectors_batch('docs', []) == []
+
+
+class TestScroll:
+    def test_cursor_walks_collection_in_pages(self, client):
+        client.create_collection('docs', 2)
+        client.insert_points('docs', [
+            {'id': i, 'vector': [float(i), 0.0]} for i in range(7)])
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            records, cursor = client.scroll('docs', cursor, limit=3)
+            seen.extend(r['id'] for r in records)
+            pages += 1
+            if cursor is None:
+                break
+        assert seen == list(range(7))
+        assert pages == 3
+
+    def test_empty_collection_returns_no_cursor(self, client):
+        client.create_collection('docs', 2)
+        records, cursor = client.scroll('docs', None, limit=3)
+        assert records == [] and cursor is None
+
+
+class TestStructLayout:
+    def test_uapi_struct_sizes(self):
+        assert kernel_client.VEXFS_VECTOR_FILE_INFO_SIZE == 40
+        assert kernel_client.VEXFS_VECTOR_SEARCH_REQUEST_SIZE == 48
+        assert kernel_client.VEXFS_BATCH_INSERT_REQUEST_SIZE == 32
+        assert kernel_client._META_STRUCT.size == \
+            kernel_client.VEXFS_VECTOR_FILE_INFO_SIZE
+        assert struct.calcsize('<QIIQI4x') == \
+            kernel_client.VEXFS_BATCH_INSERT_REQUEST_SIZE
+        assert struct.calcsize('<QIII4xQQI4x') == \
+            kernel_client.VEXFS_VECTOR_SEARCH_REQUEST_SIZE
+        assert struct.calcsize('<QIIIIQQQ') == \
+            kernel_client.VEXFS_BATCH_SEARCH_REQUEST_SIZE
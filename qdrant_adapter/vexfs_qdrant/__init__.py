@@ -0,0 +1,32 @@
+"""
+VexFS Qdrant Adapter
+
+Python adapter exposing Qdrant-compatible vector operations on top of the
+VexFS v2 kernel IOCTL interface (see kernel_module/archive/old_versions/
+vexfs_uapi.h for the authoritative ABI).
+"""
+
+from .kernel_client import (
+    VexFSError,
+    VexFSKernelClient,
+    VectorFileInfo,
+    SearchResult,
+)
+from .filter_parser import FilterError, FilterParser
+from .filter_executor import FilterEngine
+from .grpc_service import QdrantStreamingService
+from .metadata_filters import FilterExecutor
+from .pointset import PointIdSet
+
+__all__ = [
+    'VexFSError',
+    'VexFSKernelClient',
+    'VectorFileInfo',
+    'SearchResult',
+    'FilterError',
+    'FilterParser',
+    'FilterEngine',
+    'FilterExecutor',
+    'QdrantStreamingService',
+    'PointIdSet',
+]
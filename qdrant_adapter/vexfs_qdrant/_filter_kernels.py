@@ -0,0 +1,65 @@
+"""
+Vectorized range-predicate kernels.
+
+range_mask evaluates every bound of a range filter over a contiguous
+numeric column in one pass. With numba installed the loop is
+JIT-compiled with thread parallelism and a single read per element;
+without it the numpy comparison form runs, which allocates one
+intermediate mask per bound but stays in C. Missing bounds are passed
+as NaN sentinels so the jitted signature stays scalar-only.
+"""
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_NAN = float('nan')
+
+
+def _range_mask_np(column: np.ndarray, gt: float, gte: float,
+                   lt: float, lte: float) -> np.ndarray:
+    mask = np.ones(column.shape[0], dtype=bool)
+    if not math.isnan(gt):
+        mask &= column > gt
+    if not math.isnan(gte):
+        mask &= column >= gte
+    if not math.isnan(lt):
+        mask &= column < lt
+    if not math.isnan(lte):
+        mask &= column <= lte
+    return mask
+
+
+if numba is not None:
+    @numba.njit(parallel=True, cache=True)
+    def _range_mask_jit(column, gt, gte, lt, lte):
+        use_gt = not np.isnan(gt)
+        use_gte = not np.isnan(gte)
+        use_lt = not np.isnan(lt)
+        use_lte = not np.isnan(lte)
+        out = np.empty(column.shape[0], dtype=np.bool_)
+        for i in numba.prange(column.shape[0]):
+            value = column[i]
+            out[i] = ((not use_gt or value > gt) and
+                      (not use_gte or value >= gte) and
+                      (not use_lt or value < lt) and
+                      (not use_lte or value <= lte))
+        return out
+
+    _range_mask = _range_mask_jit
+else:
+    _range_mask = _range_mask_np
+
+
+def range_mask(column: np.ndarray, bounds: 'dict[str, float]') -> np.ndarray:
+    """Boolean mask of column elements satisfying every bound."""
+    return _range_mask(column,
+                       float(bounds.get('gt', _NAN)),
+                       float(bounds.get('gte', _NAN)),
+                       float(bounds.get('lt', _NAN)),
+                       float(bounds.get('lte', _NAN)))
@@ -0,0 +1,122 @@
+"""
+Vectorized geo-distance kernels.
+
+haversine_mask evaluates a whole radius predicate over contiguous lat/lon
+columns in one pass. With numba installed the loop is JIT-compiled with
+SIMD and thread parallelism; without it the numpy expression form is used,
+which is still one C pass per trig op instead of six Python-level trig
+calls per point.
+"""
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+_EARTH_RADIUS_M = 6371000.0
+
+# Radii up to ~100 km at moderate latitudes are served by an
+# equirectangular projection: two multiplies per point instead of four
+# transcendentals. Every geo evaluation path — these kernels, the scalar
+# predicate and the compiled filter programs — must apply the same cutoff
+# and the same formula so subset and dense scans agree point-for-point.
+_EQUIRECT_MAX_M = 100000.0
+_EQUIRECT_MAX_LAT = 75.0
+
+
+def _use_equirect(center_lat: float, radius_m: float) -> bool:
+    """Whether a radius filter qualifies for the flat-projection path."""
+    return radius_m <= _EQUIRECT_MAX_M and abs(center_lat) <= _EQUIRECT_MAX_LAT
+
+
+def _haversine_mask_np(lats: np.ndarray, lons: np.ndarray,
+                       center_lat: float, center_lon: float,
+                       radius_m: float) -> np.ndarray:
+    clat_r = np.radians(center_lat)
+    clon_r = np.radians(center_lon)
+    angular = radius_m / _EARTH_RADIUS_M
+    if _use_equirect(center_lat, radius_m):
+        dlat = np.radians(lats) - clat_r
+        dlon = np.abs(np.radians(lons) - clon_r)
+        dlon = np.minimum(dlon, 2.0 * np.pi - dlon)
+        dx = dlon * np.cos(clat_r)
+        return dlat * dlat + dx * dx <= angular * angular
+    # The radius test only needs a monotonic function of the distance, so
+    # compare the haversine "a" term against its precomputed threshold and
+    # skip sqrt/asin entirely.
+    a_threshold = np.sin(min(angular, np.pi) / 2.0) ** 2
+    lats_r = np.radians(lats)
+    lons_r = np.radians(lons)
+    # Cheap bounding-box pass: two comparisons per point reject most
+    # candidates before any transcendental work runs on them. The widest
+    # longitude delta on the radius circle is asin(sin(angular)/cos(lat)),
+    # not angular/cos(lat) — the latter under-covers the circle's east and
+    # west extremes — and a circle that reaches a pole spans every
+    # longitude.
+    cos_clat = np.cos(clat_r)
+    if abs(clat_r) + angular >= np.pi / 2.0:
+        dlon_max = np.pi
+    else:
+        dlon_max = np.arcsin(min(1.0, np.sin(angular) / cos_clat))
+    dlon = np.abs(lons_r - clon_r)
+    dlon = np.minimum(dlon, 2.0 * np.pi - dlon)
+    box = (np.abs(lats_r - clat_r) <= angular) & (dlon <= dlon_max)
+    out = np.zeros(lats.shape[0], dtype=bool)
+    if box.any():
+        lats_b = lats_r[box]
+        lons_b = lons_r[box]
+        a = (np.sin((lats_b - clat_r) / 2.0) ** 2 +
+             cos_clat * np.cos(lats_b) *
+             np.sin((lons_b - clon_r) / 2.0) ** 2)
+        out[box] = a <= a_threshold
+    return out
+
+
+if numba is not None:
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_mask_jit(lats, lons, center_lat, center_lon, radius_m):
+        clat_r = np.radians(center_lat)
+        clon_r = np.radians(center_lon)
+        cos_clat = np.cos(clat_r)
+        angular = radius_m / _EARTH_RADIUS_M
+        if (radius_m <= _EQUIRECT_MAX_M and
+                abs(center_lat) <= _EQUIRECT_MAX_LAT):
+            angular_sq = angular * angular
+            out = np.empty(lats.shape[0], dtype=np.bool_)
+            for i in numba.prange(lats.shape[0]):
+                dlat = np.radians(lats[i]) - clat_r
+                dlon = abs(np.radians(lons[i]) - clon_r)
+                if dlon > np.pi:
+                    dlon = 2.0 * np.pi - dlon
+                dx = dlon * cos_clat
+                out[i] = dlat * dlat + dx * dx <= angular_sq
+            return out
+        a_threshold = np.sin(min(angular, np.pi) / 2.0) ** 2
+        # Same longitude bound as the numpy form: asin-based, widening to
+        # a full sweep when the circle crosses a pole.
+        if abs(clat_r) + angular >= np.pi / 2.0:
+            dlon_max = np.pi
+        else:
+            dlon_max = np.arcsin(min(1.0, np.sin(angular) / cos_clat))
+        out = np.empty(lats.shape[0], dtype=np.bool_)
+        for i in numba.prange(lats.shape[0]):
+            lat_r = np.radians(lats[i])
+            if abs(lat_r - clat_r) > angular:
+                out[i] = False
+                continue
+            dlon_abs = abs(np.radians(lons[i]) - clon_r)
+            if dlon_abs > np.pi:
+                dlon_abs = 2.0 * np.pi - dlon_abs
+            if dlon_abs > dlon_max:
+                out[i] = False
+                continue
+            a = (np.sin((lat_r - clat_r) / 2.0) ** 2 +
+                 cos_clat * np.cos(lat_r) * np.sin(dlon_abs / 2.0) ** 2)
+            out[i] = a <= a_threshold
+        return out
+
+    haversine_mask = _haversine_mask_jit
+else:
+    haversine_mask = _haversine_mask_np
@@ -0,0 +1,113 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Cython fast path for the VexFS kernel client.
+
+Builds the IOCTL request structs in C stack buffers and calls ioctl(2)
+directly, bypassing ctypes, struct.pack and Python-level bytes allocation on
+the insert/search hot paths. The struct layouts mirror vexfs_uapi.h and are
+size-checked at compile time.
+"""
+
+from libc.stdint cimport uint32_t, uint64_t
+from libc.errno cimport errno
+
+cdef extern from "sys/ioctl.h":
+    int ioctl(int fd, unsigned long request, ...) nogil
+
+cdef extern from *:
+    """
+    #include <stdint.h>
+
+    struct vexfs_batch_insert_request {
+        uint32_t *vectors_bits;
+        uint32_t  vector_count;
+        uint32_t  dimensions;
+        uint64_t *vector_ids;
+        uint32_t  flags;
+    };
+
+    struct vexfs_vector_search_request {
+        uint32_t *query_vector_bits;
+        uint32_t  dimensions;
+        uint32_t  k;
+        uint32_t  search_type;
+        uint32_t *results_bits;
+        uint64_t *result_ids;
+        uint32_t  result_count;
+    };
+
+    _Static_assert(sizeof(struct vexfs_batch_insert_request) == 32,
+                   "vexfs_batch_insert_request size mismatch");
+    _Static_assert(sizeof(struct vexfs_vector_search_request) == 48,
+                   "vexfs_vector_search_request size mismatch");
+
+    #define VEXFS_IOC_BATCH_INSERT \
+        _IOW('V', 4, struct vexfs_batch_insert_request)
+    #define VEXFS_IOC_VECTOR_SEARCH \
+        _IOWR('V', 3, struct vexfs_vector_search_request)
+    """
+    struct vexfs_batch_insert_request:
+        uint32_t *vectors_bits
+        uint32_t  vector_count
+        uint32_t  dimensions
+        uint64_t *vector_ids
+        uint32_t  flags
+
+    struct vexfs_vector_search_request:
+        uint32_t *query_vector_bits
+        uint32_t  dimensions
+        uint32_t  k
+        uint32_t  search_type
+        uint32_t *results_bits
+        uint64_t *result_ids
+        uint32_t  result_count
+
+    unsigned long VEXFS_IOC_BATCH_INSERT
+    unsigned long VEXFS_IOC_VECTOR_SEARCH
+
+
+cdef class Client:
+    """Thin wrapper owning nothing but the VexFS file descriptor."""
+
+    cdef int fd
+
+    def __cinit__(self, int fd):
+        self.fd = fd
+
+    cpdef int insert(self, const uint32_t[::1] bits,
+                     const uint64_t[::1] ids,
+                     uint32_t count, uint32_t dims,
+                     uint32_t flags) except -1:
+        """Issue VEXFS_IOC_BATCH_INSERT; returns 0 or raises OSError."""
+        cdef vexfs_batch_insert_request req
+        cdef int rc
+        req.vectors_bits = <uint32_t *> &bits[0]
+        req.vector_count = count
+        req.dimensions = dims
+        req.vector_ids = <uint64_t *> &ids[0]
+        req.flags = flags
+        with nogil:
+            rc = ioctl(self.fd, VEXFS_IOC_BATCH_INSERT, &req)
+        if rc != 0:
+            raise OSError(errno, "VEXFS_IOC_BATCH_INSERT failed")
+        return 0
+
+    cpdef uint32_t search(self, const uint32_t[::1] query_bits,
+                          uint32_t dims, uint32_t k, uint32_t search_type,
+                          uint32_t[::1] out_bits,
+                          uint64_t[::1] out_ids) except? 0xFFFFFFFF:
+        """Issue VEXFS_IOC_VECTOR_SEARCH; returns the result count."""
+        cdef vexfs_vector_search_request req
+        cdef int rc
+        req.query_vector_bits = <uint32_t *> &query_bits[0]
+        req.dimensions = dims
+        req.k = k
+        req.search_type = search_type
+        req.results_bits = &out_bits[0]
+        req.result_ids = &out_ids[0]
+        req.result_count = 0
+        with nogil:
+            rc = ioctl(self.fd, VEXFS_IOC_VECTOR_SEARCH, &req)
+        if rc != 0:
+            raise OSError(errno, "VEXFS_IOC_VECTOR_SEARCH failed")
+        return req.result_count
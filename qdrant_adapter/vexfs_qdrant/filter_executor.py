@@ -0,0 +1,655 @@
+"""
+Filter engine.
+
+FilterEngine is the entry point for Qdrant-style filtered queries: it parses
+the filter DSL, drives FilterExecutor over the collection, combines the
+must / should / must_not clauses and returns matching point IDs. Clause
+combination runs on PointIdSet bitmaps, so AND/OR/NOT over large candidate
+sets are word-parallel bitwise operations rather than hashed set algebra.
+"""
+
+import functools
+import itertools
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .filter_parser import FilterError, FilterParser, _canonical_key
+from .kernel_client import VexFSError, VexFSKernelClient
+from .metadata_filters import FilterExecutor
+from .pointset import (IdBloom, LazyStringRange, PointIdSet, reduce_at_least,
+                       reduce_or)
+
+logger = logging.getLogger(__name__)
+
+
+class FilterStats:
+    """
+    Lock-free filter execution counters.
+
+    Each counter is an itertools.count bumped with next(), which is a single
+    C-level operation under the GIL — no read-modify-write to race on when
+    the engine is shared across server threads. The timing accumulator
+    remains a plain int; a lost nanosecond sample under contention is
+    acceptable where a lost request count is not.
+    """
+
+    __slots__ = ('total_filters', 'successful_filters', 'failed_filters',
+                 'must_early_exits', 'total_execution_time_ns')
+
+    def __init__(self) -> None:
+        self.total_filters = itertools.count()
+        self.successful_filters = itertools.count()
+        self.failed_filters = itertools.count()
+        self.must_early_exits = itertools.count()
+        self.total_execution_time_ns = 0
+
+    @staticmethod
+    def _value(counter: 'itertools.count') -> int:
+        # count pickles as (count, (next_value,)); next_value equals the
+        # number of next() calls so far for a zero-based counter.
+        return counter.__reduce__()[1][0]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            'total_filters': self._value(self.total_filters),
+            'successful_filters': self._value(self.successful_filters),
+            'failed_filters': self._value(self.failed_filters),
+            'must_early_exits': self._value(self.must_early_exits),
+            'total_execution_time_ns': self.total_execution_time_ns,
+        }
+
+
+class FilterEngine:
+    """Applies Qdrant-style filters to VexFS collections."""
+
+    def __init__(self, vexfs_client: VexFSKernelClient):
+        self.client = vexfs_client
+        self.parser = FilterParser()
+        self.executor = FilterExecutor(vexfs_client)
+        self._compiled_cache: Dict[str, Optional[Callable[[Dict[str, Any]],
+                                                          bool]]] = {}
+        self._id_blooms: Dict[str, 'tuple[int, IdBloom]'] = {}
+        self._all_points_cache: Dict[str, 'tuple[int, PointIdSet]'] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._filter_stats = FilterStats()
+
+    # -------------------------------------------------------------------------
+    # Public interface
+    # -------------------------------------------------------------------------
+
+    def apply_filter(self, collection: str,
+                     filter_condition: Optional[Dict[str, Any]],
+                     point_ids: Optional[List[str]] = None) -> Sequence[str]:
+        """
+        Apply a filter condition to a collection.
+
+        Args:
+            collection: Collection name
+            filter_condition: Raw Qdrant-style filter dict; None/empty means
+                no filtering
+            point_ids: Optional candidate subset; defaults to all points
+
+        Returns:
+            Matching point IDs as strings
+
+        Raises:
+            FilterError: If the filter condition is malformed
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            if not filter_condition:
+                if point_ids is not None:
+                    result = [str(pid) for pid in point_ids]
+                else:
+                    result = self._get_all_collection_points(
+                        collection).to_string_list()
+                self._update_stats(start_ns, True)
+                return result
+
+            if point_ids is not None and not point_ids:
+                # Caller already filtered down to nothing; skip the parse.
+                self._update_stats(start_ns, True)
+                return []
+
+            parsed = self.parser.parse_filter(filter_condition)
+
+            result_set = self.execute_plan(collection, parsed, point_ids)
+
+            result = result_set.to_string_list()
+            self._update_stats(start_ns, True)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Filter applied successfully: %d matches, complexity %d",
+                    len(result),
+                    self.parser.estimate_filter_complexity(parsed))
+            return result
+        except (FilterError, VexFSError) as e:
+            self._update_stats(start_ns, False)
+            logger.error("Filter application failed: %s", e)
+            raise
+
+    def count_filter(self, collection: str,
+                     filter_condition: Optional[Dict[str, Any]],
+                     point_ids: Optional[List[str]] = None) -> int:
+        """
+        Count matching points without materializing their IDs.
+
+        Pagination and stats endpoints only need the cardinality; this path
+        stops at the bitmap popcount instead of building the string list.
+        """
+        start_ns = time.perf_counter_ns()
+        try:
+            if not filter_condition:
+                if point_ids is not None:
+                    count = len(point_ids)
+                else:
+                    info = self.client._get_info(collection)
+                    count = info.vector_count
+                self._update_stats(start_ns, True)
+                return count
+
+            if point_ids is not None and not point_ids:
+                self._update_stats(start_ns, True)
+                return 0
+
+            parsed = self.parser.parse_filter(filter_condition)
+            count = len(self.execute_plan(collection, parsed, point_ids))
+            self._update_stats(start_ns, True)
+            return count
+        except (FilterError, VexFSError) as e:
+            self._update_stats(start_ns, False)
+            logger.error("Filter count failed: %s", e)
+            raise
+
+    def execute_plan(self, collection: str, parsed: Dict[str, Any],
+                     point_ids: Optional[List[str]] = None) -> PointIdSet:
+        """
+        Execute a pre-parsed filter tree with a fused bitmap pipeline.
+
+        Boolean nodes fold their clauses into one accumulator in place —
+        must intersects (most selective first), should is unioned then
+        intersected, must_not subtracts — so no per-clause intermediate set
+        outlives its fold step, and evaluation stops as soon as the
+        accumulator empties.
+        """
+        if parsed['type'] != 'boolean':
+            if parsed['type'] == 'always_false':
+                # Folded away at parse time; nothing can match.
+                return PointIdSet.empty()
+            if parsed['type'] == 'always_true':
+                if point_ids is not None:
+                    return PointIdSet.from_ids(point_ids)
+                return self._get_all_collection_points(collection)
+            if parsed['type'] == 'has_id':
+                parsed = self._prefilter_has_id(collection, parsed)
+                return self.executor.execute_filter(collection, parsed,
+                                                    point_ids)
+            return self.executor.execute_filter(
+                collection, parsed, point_ids,
+                predicate=self._compile_cached(parsed))
+
+        if point_ids is None:
+            fused = self.executor.execute_boolean_fused(collection, parsed)
+            if fused is not None:
+                return fused
+
+        acc: Optional[PointIdSet] = None
+        if point_ids is None:
+            # Cardinality estimates from materialized stats beat the static
+            # type ranking when both are available; the type score breaks
+            # ties so the ordering stays deterministic.
+            must_children = sorted(
+                parsed['must'],
+                key=lambda child: (self.executor.estimate_cardinality(
+                    collection, child), self._selectivity_score(child)))
+        else:
+            must_children = sorted(parsed['must'],
+                                   key=self._selectivity_score)
+        for index, child in enumerate(must_children):
+            matches = self.execute_plan(collection, child, point_ids)
+            if acc is None:
+                acc = matches
+            else:
+                acc &= matches
+            if not acc:
+                if index < len(must_children) - 1:
+                    next(self._filter_stats.must_early_exits)
+                return acc
+        if parsed['should']:
+            min_should = parsed.get('min_should_match', 1)
+            should_sets = [self.execute_plan(collection, child, point_ids)
+                           for child in parsed['should']]
+            if min_should > 1:
+                should_union = reduce_at_least(should_sets, min_should)
+            else:
+                should_union = reduce_or(should_sets)
+            if acc is None:
+                acc = should_union
+            else:
+                acc &= should_union
+            if not acc:
+                return acc
+        if parsed['must_not']:
+            must_not_children = parsed['must_not']
+            if acc is None:
+                if point_ids is not None:
+                    acc = PointIdSet.from_ids(point_ids)
+                else:
+                    # Pure-negation node: seed the accumulator with the
+                    # complement of the first clause instead of allocating
+                    # the all-points universe and subtracting from it.
+                    count = self.client._get_info(collection).vector_count
+                    acc = self.execute_plan(
+                        collection, must_not_children[0]).complement(count)
+                    must_not_children = must_not_children[1:]
+                    if not acc:
+                        return acc
+            for child in must_not_children:
+                acc -= self.execute_plan(collection, child, point_ids)
+                if not acc:
+                    return acc
+        if acc is None:
+            # Boolean node with empty clause lists matches everything.
+            if point_ids is not None:
+                acc = PointIdSet.from_ids(point_ids)
+            else:
+                acc = self._get_all_collection_points(collection)
+        return acc
+
+    def validate_filter(self, filter_condition: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate a filter condition without executing it.
+
+        Returns:
+            Dict with 'valid', 'complexity' and 'fields' keys
+        """
+        try:
+            parsed = self.parser.parse_filter(filter_condition)
+        except FilterError as e:
+            return {'valid': False, 'error': str(e)}
+        return {
+            'valid': True,
+            'complexity': self.parser.estimate_filter_complexity(parsed),
+            'fields': sorted(self.parser.get_filter_fields(parsed)),
+        }
+
+    def get_filter_statistics(self) -> Dict[str, Any]:
+        """Snapshot of filter execution statistics."""
+        stats = self._filter_stats.snapshot()
+        total = stats['total_filters']
+        stats['total_execution_time'] = stats['total_execution_time_ns'] / 1e9
+        stats['avg_execution_time'] = (
+            stats['total_execution_time'] / total if total else 0.0)
+        stats['cache'] = self.executor.get_cache_stats()
+        return stats
+
+    def clear_cache(self) -> None:
+        """Drop all cached filter state."""
+        self.parser.clear_cache()
+        self._compiled_cache.clear()
+        self._id_blooms.clear()
+        self._all_points_cache.clear()
+        self.executor.clear_cache()
+
+    # -------------------------------------------------------------------------
+    # Clause processing
+    # -------------------------------------------------------------------------
+
+    def process_must_conditions(self, collection: str,
+                                conditions: List[Dict[str, Any]],
+                                point_ids: Optional[List[str]] = None
+                                ) -> PointIdSet:
+        """
+        AND-fold must conditions; in-place bitmap intersection.
+
+        Conditions are reordered most-selective-first so the cheapest, most
+        restrictive predicates shrink the intermediate set early and the
+        empty-set short-circuit fires as soon as possible.
+        """
+        parsed_conditions = sorted(
+            (self._parse_cached(c) for c in conditions),
+            key=self._selectivity_score)
+        condition_sets = self.executor.execute_filters_batch(
+            collection, parsed_conditions, point_ids)
+        result_set: Optional[PointIdSet] = None
+        for matches in condition_sets:
+            if result_set is None:
+                result_set = matches
+            else:
+                result_set &= matches
+            if not result_set:
+                break
+        return result_set if result_set is not None else PointIdSet.empty()
+
+    def process_should_conditions(self, collection: str,
+                                  conditions: List[Dict[str, Any]],
+                                  point_ids: Optional[List[str]] = None,
+                                  parallel: bool = True) -> PointIdSet:
+        """
+        OR-fold should conditions; in-place bitmap union.
+
+        Conditions are independent under OR semantics, so with two or more
+        of them they are evaluated concurrently on a shared thread pool;
+        pass ``parallel=False`` to force serial evaluation under load.
+        """
+        if point_ids is not None and not point_ids:
+            return PointIdSet.empty()
+        if parallel and len(conditions) > 1:
+            futures = [self._get_pool().submit(self._parse_and_execute,
+                                               collection, condition,
+                                               point_ids)
+                       for condition in conditions]
+            condition_sets = [future.result() for future in futures]
+        else:
+            condition_sets = self.executor.execute_filters_batch(
+                collection, [self._parse_cached(c) for c in conditions],
+                point_ids)
+        return reduce_or(condition_sets)
+
+    def process_must_not_conditions(self, collection: str,
+                                    conditions: List[Dict[str, Any]],
+                                    point_ids: Optional[List[str]] = None,
+                                    base_set: Optional[PointIdSet] = None
+                                    ) -> PointIdSet:
+        """Subtract must_not matches from the base set (bitmap difference)."""
+        if point_ids is not None and not point_ids:
+            return base_set if base_set is not None else PointIdSet.empty()
+        if base_set is not None:
+            result_set = base_set
+        elif point_ids is not None:
+            result_set = PointIdSet.from_ids(point_ids)
+        else:
+            result_set = self._get_all_collection_points(collection)
+        condition_sets = self.executor.execute_filters_batch(
+            collection, [self._parse_cached(c) for c in conditions],
+            point_ids)
+        for matches in condition_sets:
+            result_set -= matches
+            if not result_set:
+                break
+        return result_set
+
+    # -------------------------------------------------------------------------
+    # Internals
+    # -------------------------------------------------------------------------
+
+    def compile_filter(self, filter_condition: Dict[str, Any]
+                       ) -> Callable[[Dict[str, Any]], bool]:
+        """
+        Compile a filter condition into a row predicate.
+
+        The parsed tree is lowered to a single Python expression over the
+        metadata dict and compiled once, so repeated evaluation pays no
+        dict-dispatch per node. has_id filters have no row representation
+        and cannot be compiled.
+
+        Raises:
+            FilterError: If the condition is malformed or contains has_id
+        """
+        compiled = self._compile_cached(self.parser.parse_filter(
+            filter_condition))
+        if compiled is None:
+            raise FilterError(
+                "has_id filters cannot be compiled to a row predicate")
+        return compiled
+
+    def _compile_cached(self, parsed: Dict[str, Any]
+                        ) -> Optional[Callable[[Dict[str, Any]], bool]]:
+        """Compiled predicate for a parsed tree, or None if uncompilable."""
+        key = _canonical_key(parsed)
+        if key in self._compiled_cache:
+            return self._compiled_cache[key]
+        try:
+            source = _codegen(parsed, counter=iter(range(1 << 20)))
+        except _Uncompilable:
+            compiled: Optional[Callable[[Dict[str, Any]], bool]] = None
+        else:
+            namespace = {'_geo': self.executor._geo_within,
+                         '_bbox': self.executor._bbox_within}
+            try:
+                exec(compile(f'def _predicate(r):\n    return {source}\n',
+                             '<filter>', 'exec'), namespace)
+                compiled = namespace['_predicate']
+            except (SyntaxError, ValueError):
+                # A value whose repr does not round-trip (pathological
+                # metadata constants) must not take the query down; the
+                # interpreter walk handles anything parseable.
+                logger.warning("Predicate codegen failed; falling back to "
+                               "the interpreter")
+                compiled = None
+        self._compiled_cache[key] = compiled
+        return compiled
+
+    def _prefilter_has_id(self, collection: str,
+                          parsed: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drop requested IDs the collection's Bloom filter proves absent.
+
+        The bloom is built lazily per collection and versioned on
+        vector_count, so inserts invalidate it without explicit hooks.
+        False positives are fine — the exact filter runs on what remains.
+        """
+        info = self.client._get_info(collection)
+        cached = self._id_blooms.get(collection)
+        if cached is None or cached[0] != info.vector_count:
+            bloom = IdBloom(LazyStringRange(info.vector_count),
+                            info.vector_count)
+            self._id_blooms[collection] = (info.vector_count, bloom)
+        else:
+            bloom = cached[1]
+        kept = [pid for pid in parsed['ids'] if pid in bloom]
+        if len(kept) == len(parsed['ids']):
+            return parsed
+        return {**parsed, 'ids': kept}
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Lazily created pool for independent condition evaluation."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=min(8, os.cpu_count() or 1),
+                thread_name_prefix='vexfs-filter')
+        return self._pool
+
+    def _parse_and_execute(self, collection: str,
+                           condition: Dict[str, Any],
+                           point_ids: Optional[List[str]]) -> PointIdSet:
+        return self.executor.execute_filter(
+            collection, self._parse_cached(condition), point_ids)
+
+    @staticmethod
+    def _selectivity_score(parsed: Dict[str, Any]) -> int:
+        """
+        Cheap selectivity heuristic for AND reordering: has_id has known
+        cardinality, equality match usually beats a range, geo is the most
+        expensive leaf and nested booleans are opaque.
+        """
+        return {'always_false': -1, 'has_id': 0, 'match': 1, 'range': 2,
+                'geo_radius': 3}.get(parsed['type'], 4)
+
+    def _parse_cached(self, condition: Dict[str, Any]) -> Dict[str, Any]:
+        """Parse a condition; caching lives in the parser itself."""
+        return self.parser.parse_filter(condition)
+
+    def _get_all_collection_points(self, collection: str) -> PointIdSet:
+        """
+        Dense bitmap covering every point in the collection.
+
+        The template is cached per collection and versioned on vector_count
+        (bumped by inserts), so repeated must_not/empty-clause evaluations
+        reuse it; callers get a copy because the clause folds mutate their
+        accumulator in place.
+        """
+        info = self.client._get_info(collection)
+        cached = self._all_points_cache.get(collection)
+        if cached is None or cached[0] != info.vector_count:
+            cached = (info.vector_count,
+                      PointIdSet.from_range(info.vector_count))
+            self._all_points_cache[collection] = cached
+        return cached[1].copy()
+
+    def _update_stats(self, start_ns: int, success: bool) -> None:
+        # Integer-only on the hot path; the average is derived lazily in
+        # get_filter_statistics so no division happens per filter.
+        stats = self._filter_stats
+        next(stats.total_filters)
+        next(stats.successful_filters if success else stats.failed_filters)
+        stats.total_execution_time_ns += time.perf_counter_ns() - start_ns
+
+
+# =============================================================================
+# Predicate codegen
+# =============================================================================
+
+class _Uncompilable(Exception):
+    """Raised while lowering a node that has no row-predicate form."""
+
+
+def _codegen(parsed: Dict[str, Any], counter) -> str:
+    """Lower a parsed filter node to a Python expression over row dict r."""
+    node_type = parsed['type']
+    if node_type == 'always_false':
+        return 'False'
+    if node_type == 'always_true':
+        return 'True'
+    if node_type == 'boolean':
+        parts = [_codegen(child, counter) for child in parsed['must']]
+        parts += [f'not {_codegen(child, counter)}'
+                  for child in parsed['must_not']]
+        if parsed['should']:
+            min_should = parsed.get('min_should_match', 1)
+            if min_should > 1:
+                # bools sum as ints, so the tally compiles to an add chain.
+                parts.append('((' + ' + '.join(
+                    f'({_codegen(child, counter)})'
+                    for child in parsed['should']) + f') >= {min_should})')
+            else:
+                parts.append('(' + ' or '.join(
+                    _codegen(child, counter)
+                    for child in parsed['should']) + ')')
+        return '(' + ' and '.join(parts) + ')' if parts else 'True'
+    if node_type == 'match':
+        v = f'v{next(counter)}'
+        key, value = repr(parsed['key']), repr(parsed['value'])
+        return (f'(({v} := r.get({key})) == {value} or '
+                f'(isinstance({v}, list) and {value} in {v}))')
+    if node_type == 'range':
+        v = f'v{next(counter)}'
+        checks = [f'isinstance(({v} := r.get({parsed["key"]!r})), (int, float))',
+                  f'not isinstance({v}, bool)']
+        ops = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+        checks += [f'{v} {ops[bound]} {value!r}'
+                   for bound, value in parsed['bounds'].items()]
+        return '(' + ' and '.join(checks) + ')'
+    if node_type == 'geo_radius':
+        return (f'_geo(r.get({parsed["key"]!r}), {parsed["lat"]!r}, '
+                f'{parsed["lon"]!r}, {parsed["radius"]!r})')
+    if node_type == 'geo_bounding_box':
+        return (f'_bbox(r.get({parsed["key"]!r}), {parsed["top"]!r}, '
+                f'{parsed["left"]!r}, {parsed["bottom"]!r}, '
+                f'{parsed["right"]!r})')
+    if node_type == 'is_null':
+        return f'(r.get({parsed["key"]!r}) is None)'
+    if node_type == 'is_empty':
+        v = f'v{next(counter)}'
+        return (f'(({v} := r.get({parsed["key"]!r})) is None or '
+                f'{v} == [] or {v} == "" or {v} == {{}})')
+    raise _Uncompilable(node_type)
+
+
+# =============================================================================
+# Filter construction helpers
+# =============================================================================
+#
+# The helpers memoize on their arguments, so templated hot loops get the same
+# canonical dict back instead of a fresh allocation per call. Treat returned
+# dicts as immutable templates; .copy() before mutating.
+
+@functools.lru_cache(maxsize=1024)
+def _match_template(key: str, value: Any) -> Dict[str, Any]:
+    return {'key': key, 'match': {'value': value}}
+
+
+@functools.lru_cache(maxsize=1024)
+def _range_template(key: str, gte: Optional[float], lte: Optional[float],
+                    gt: Optional[float], lt: Optional[float]) -> Dict[str, Any]:
+    bounds: Dict[str, float] = {}
+    if gte is not None:
+        bounds['gte'] = gte
+    if lte is not None:
+        bounds['lte'] = lte
+    if gt is not None:
+        bounds['gt'] = gt
+    if lt is not None:
+        bounds['lt'] = lt
+    return {'key': key, 'range': bounds}
+
+
+@functools.lru_cache(maxsize=1024)
+def _geo_template(key: str, lat: float, lon: float,
+                  radius: float) -> Dict[str, Any]:
+    return {'key': key,
+            'geo_radius': {'center': {'lat': lat, 'lon': lon},
+                           'radius': radius}}
+
+
+@functools.lru_cache(maxsize=1024)
+def _id_template(point_ids: 'tuple') -> Dict[str, Any]:
+    return {'has_id': list(point_ids)}
+
+
+def create_match_filter(key: str, value: Any) -> Dict[str, Any]:
+    """Build a match condition for a metadata field (cached template)."""
+    try:
+        return _match_template(key, value)
+    except TypeError:
+        # Unhashable value (e.g. a list); build uncached.
+        return {'key': key, 'match': {'value': value}}
+
+
+def create_range_filter(key: str, gte: Optional[float] = None,
+                        lte: Optional[float] = None,
+                        gt: Optional[float] = None,
+                        lt: Optional[float] = None) -> Dict[str, Any]:
+    """Build a numeric range condition; only supplied bounds are included."""
+    return _range_template(key, gte, lte, gt, lt)
+
+
+def create_geo_filter(key: str, lat: float, lon: float,
+                      radius: float) -> Dict[str, Any]:
+    """Build a geo-radius condition (radius in meters, cached template)."""
+    return _geo_template(key, lat, lon, radius)
+
+
+def create_id_filter(point_ids: List[Any]) -> Dict[str, Any]:
+    """Build a has_id condition (cached template)."""
+    try:
+        return _id_template(tuple(point_ids))
+    except TypeError:
+        return {'has_id': list(point_ids)}
+
+
+def create_boolean_filter(must: Optional[List[Dict[str, Any]]] = None,
+                          should: Optional[List[Dict[str, Any]]] = None,
+                          must_not: Optional[List[Dict[str, Any]]] = None,
+                          min_should_match: Optional[int] = None
+                          ) -> Dict[str, Any]:
+    """
+    Build a boolean combination of conditions.
+
+    Not cached: the clause lists contain dicts, which are unhashable, and
+    boolean shapes rarely repeat verbatim anyway.
+    """
+    condition: Dict[str, Any] = {}
+    if must:
+        condition['must'] = list(must)
+    if should:
+        condition['should'] = list(should)
+    if must_not:
+        condition['must_not'] = list(must_not)
+    if min_should_match is not None:
+        condition['min_should_match'] = min_should_match
+    return condition
@@ -0,0 +1,620 @@
+"""
+Qdrant filter DSL parser.
+
+Parses the JSON filter conditions accepted by the Qdrant-compatible API into
+an internal tree that FilterExecutor evaluates against point metadata.
+Supported leaves: match, range, geo_radius, is_null, is_empty, has_id;
+boolean composition via must / should / must_not.
+"""
+
+import functools
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Union
+
+try:
+    # Optional C-extension JSON encoder; canonical cache keys fall back to
+    # the stdlib encoder without it.
+    import orjson
+except ImportError:
+    orjson = None
+
+from .kernel_client import VexFSError
+
+logger = logging.getLogger(__name__)
+
+_PARSE_CACHE_SIZE = 2048
+_RANGE_OPS = frozenset(('gt', 'gte', 'lt', 'lte'))
+_BOOL_KEYS = frozenset(('must', 'should', 'must_not'))
+_FIELD_OP_KEYS = frozenset(('match', 'range', 'geo_radius',
+                            'geo_bounding_box', 'is_null', 'is_empty'))
+
+
+class FilterError(VexFSError):
+    """Raised when a filter condition cannot be parsed or validated."""
+    pass
+
+
+if orjson is not None:
+    def _canonical_key(value: Any) -> bytes:
+        """Canonical serialized form of a condition, for cache keys."""
+        return orjson.dumps(value, option=orjson.OPT_SORT_KEYS)
+else:
+    def _canonical_key(value: Any) -> str:
+        """Canonical serialized form of a condition, for cache keys."""
+        return json.dumps(value, sort_keys=True, separators=(',', ':'))
+
+
+@functools.lru_cache(maxsize=4096)
+def _normalize_id(point_id: str) -> str:
+    """Canonical string form of one point ID; memoized across requests."""
+    if point_id.isdigit():
+        # Numeric IDs are already canonical and cannot be UUIDs.
+        return point_id
+    import uuid  # deferred: only non-numeric IDs pay the import
+    try:
+        return str(uuid.UUID(point_id))
+    except ValueError:
+        return point_id
+
+
+def _signature_bit(value: Any) -> int:
+    """One of 64 hash-derived signature bits for a filter literal."""
+    return 1 << (hash(value) & 63)
+
+
+def _flatten_clause(children: List[Dict[str, Any]],
+                    clause: str) -> List[Dict[str, Any]]:
+    """
+    Splice nested pure-AND (or pure-OR) boolean children into the parent.
+
+    Only trees whose sole populated clause matches the parent's are
+    flattened — must-in-must and plain should-in-should — which is where
+    clients wrapping conditions in redundant boolean layers end up.
+    """
+    flattened: List[Dict[str, Any]] = []
+    for child in children:
+        if (child['type'] == 'boolean' and child[clause] and
+                not child['must_not'] and
+                not (child['should'] if clause == 'must'
+                     else child['must']) and
+                child['min_should_match'] == 1):
+            flattened.extend(child[clause])
+        else:
+            flattened.append(child)
+    return flattened
+
+
+def _dedupe(children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop structurally identical clauses, preserving first occurrence."""
+    if len(children) < 2:
+        return children
+    seen = set()
+    unique = []
+    for child in children:
+        key = _canonical_key(child)
+        if key not in seen:
+            seen.add(key)
+            unique.append(child)
+    return unique
+
+
+def _range_is_empty(bounds: Dict[str, float]) -> bool:
+    """Whether an intersected bound set admits no value at all."""
+    lower, lower_strict = -float('inf'), False
+    if 'gte' in bounds:
+        lower = bounds['gte']
+    if 'gt' in bounds and bounds['gt'] >= lower:
+        lower, lower_strict = bounds['gt'], True
+    upper, upper_strict = float('inf'), False
+    if 'lte' in bounds:
+        upper = bounds['lte']
+    if 'lt' in bounds and bounds['lt'] <= upper:
+        upper, upper_strict = bounds['lt'], True
+    return (lower > upper or
+            (lower == upper and (lower_strict or upper_strict)))
+
+
+class FilterParser:
+    """Parses and validates Qdrant-style filter condition dictionaries."""
+
+    def __init__(self) -> None:
+        # Clients reissue the same handful of filter shapes (dashboards,
+        # paginated queries), so parsed trees are cached by canonical JSON;
+        # cached trees are shared — treat them as immutable.
+        self._parse_cache: Dict[str, Dict[str, Any]] = {}
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    _SUPPORTED_OPERATORS: 'frozenset[str]' = \
+        _FIELD_OP_KEYS | _BOOL_KEYS | {'has_id'}
+
+    @property
+    def supported_operators(self) -> 'frozenset[str]':
+        """Operators understood by this parser."""
+        return self._SUPPORTED_OPERATORS
+
+    # -------------------------------------------------------------------------
+    # Classification helpers
+    # -------------------------------------------------------------------------
+
+    def is_boolean_filter(self, condition: Dict[str, Any]) -> bool:
+        return not _BOOL_KEYS.isdisjoint(condition)
+
+    def is_id_filter(self, condition: Dict[str, Any]) -> bool:
+        return 'has_id' in condition
+
+    def is_field_filter(self, condition: Dict[str, Any]) -> bool:
+        return 'key' in condition
+
+    # -------------------------------------------------------------------------
+    # Validation
+    # -------------------------------------------------------------------------
+
+    def validate_filter_structure(self, condition: Dict[str, Any]) -> bool:
+        """
+        Standalone structural check of a raw condition dict.
+
+        parse_filter performs these checks inline as it walks, so this is
+        no longer called on the parse path; it remains for callers that
+        want to vet a filter without building the tree.
+
+        Walks the tree with an explicit worklist instead of recursing, so
+        wide must lists cost one loop iteration per node rather than a
+        call frame, and pathologically deep client filters cannot hit the
+        interpreter recursion limit.
+
+        Returns:
+            True if the structure is well-formed
+
+        Raises:
+            FilterError: On malformed conditions
+        """
+        stack = [condition]
+        while stack:
+            current = stack.pop()
+            if not isinstance(current, dict):
+                raise FilterError(f"Filter condition must be a dict, "
+                                  f"got {type(current).__name__}")
+            if self.is_boolean_filter(current):
+                for clause in ('must', 'should', 'must_not'):
+                    children = current.get(clause)
+                    if children is None:
+                        continue
+                    if not isinstance(children, list):
+                        raise FilterError(f"'{clause}' must be a list")
+                    stack.extend(children)
+            elif self.is_id_filter(current):
+                if not isinstance(current['has_id'], list):
+                    raise FilterError("'has_id' must be a list of point IDs")
+            elif self.is_field_filter(current):
+                operators = current.keys() - ('key',)
+                if not operators:
+                    raise FilterError(f"Field filter on '{current['key']}' "
+                                      f"has no operator")
+                unsupported = operators - _FIELD_OP_KEYS
+                if unsupported:
+                    raise FilterError(f"Unsupported filter operator: "
+                                      f"{sorted(unsupported)[0]}")
+            else:
+                raise FilterError(f"Unrecognized filter condition: "
+                                  f"{sorted(current.keys())}")
+        return True
+
+    # -------------------------------------------------------------------------
+    # Parsing
+    # -------------------------------------------------------------------------
+
+    def parse_filter(self, condition: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Parse a raw filter condition into the internal tree.
+
+        Args:
+            condition: Raw Qdrant-style filter dict
+
+        Returns:
+            Parsed node dict with a 'type' discriminator
+
+        Raises:
+            FilterError: If the condition is malformed
+        """
+        try:
+            key = _canonical_key(condition)
+        except TypeError:
+            key = None  # unserializable value; parse uncached
+        if key is not None:
+            parsed = self._parse_cache.get(key)
+            if parsed is not None:
+                self._cache_hits += 1
+                return parsed
+        parsed = self._parse_uncached(condition)
+        if key is not None:
+            self._cache_misses += 1
+            if len(self._parse_cache) >= _PARSE_CACHE_SIZE:
+                self._parse_cache.pop(next(iter(self._parse_cache)))
+            self._parse_cache[key] = parsed
+        return parsed
+
+    def _parse_uncached(self, condition: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Full parse of one condition; children go back through the cache.
+
+        Validation is fused into the parse itself: each branch checks the
+        keys it is about to consume, so a condition's keys are walked once
+        instead of a validator pass followed by a parsing pass.
+        validate_filter_structure remains available as a standalone check.
+        """
+        if not isinstance(condition, dict):
+            raise FilterError(f"Filter condition must be a dict, "
+                              f"got {type(condition).__name__}")
+
+        # Fast paths for the filter shapes that dominate real traffic: a
+        # bare field condition, or one condition wrapped in a single-entry
+        # must. These skip the boolean assembly; the per-op parsers still
+        # validate their own operands.
+        keys = condition.keys()
+        if keys == {'key', 'match'}:
+            return self._parse_match(condition['key'], condition['match'])
+        if keys == {'key', 'range'}:
+            return self._parse_range(condition['key'], condition['range'])
+        if keys == {'must'}:
+            must = condition['must']
+            if isinstance(must, list) and len(must) == 1 and \
+                    isinstance(must[0], dict):
+                return self.parse_filter(must[0])
+
+        if self.is_boolean_filter(condition):
+            for clause in ('must', 'should', 'must_not'):
+                children = condition.get(clause)
+                if children is not None and not isinstance(children, list):
+                    raise FilterError(f"'{clause}' must be a list")
+            min_should = condition.get('min_should_match', 1)
+            if not isinstance(min_should, int) or isinstance(min_should, bool) \
+                    or min_should < 1:
+                raise FilterError("'min_should_match' must be a positive "
+                                  "integer")
+            return self._simplify({
+                'type': 'boolean',
+                'must': [self.parse_filter(c)
+                         for c in condition.get('must', [])],
+                'should': [self.parse_filter(c)
+                           for c in condition.get('should', [])],
+                'must_not': [self.parse_filter(c)
+                             for c in condition.get('must_not', [])],
+                'min_should_match': min_should,
+            })
+
+        if self.is_id_filter(condition):
+            if not isinstance(condition['has_id'], list):
+                raise FilterError("'has_id' must be a list of point IDs")
+            ids = self.normalize_ids(condition['has_id'])
+            if not ids:
+                return _always_false()
+            bloom = 0
+            for point_id in ids:
+                bloom |= _signature_bit(point_id)
+            return self._annotate({'type': 'has_id', 'ids': ids,
+                                   'bloom': bloom})
+
+        if self.is_field_filter(condition):
+            key = condition['key']
+            # Data-driven operator dispatch; iteration order of the table
+            # preserves the precedence the old if-chain had when a
+            # condition carries more than one operator.
+            for op, parse in self._FIELD_PARSERS.items():
+                operand = condition.get(op)
+                if operand is not None or op in condition:
+                    return parse(self, key, operand)
+            unsupported = keys - ('key',) - _FIELD_OP_KEYS
+            if unsupported:
+                raise FilterError(f"Unsupported filter operator: "
+                                  f"{sorted(unsupported)[0]}")
+            raise FilterError(f"Field filter on '{key}' has no operator")
+
+        raise FilterError(f"Unrecognized filter condition: {sorted(keys)}")
+
+    def _parse_match(self, key: str, match: Any) -> Dict[str, Any]:
+        if isinstance(match, dict):
+            if 'value' in match:
+                value = match['value']
+            elif 'any' in match:
+                # MatchAny: equal to any listed value. Lowered to a plain
+                # OR so the executor and compiler need no new leaf type.
+                values = match['any']
+                if not isinstance(values, list):
+                    raise FilterError("'match.any' must be a list of values")
+                if not values:
+                    return _always_false()
+                return self._simplify({
+                    'type': 'boolean', 'must': [], 'must_not': [],
+                    'should': [self._parse_match(key, v) for v in values],
+                    'min_should_match': 1})
+            elif 'except' in match:
+                # MatchExcept: equal to none of the listed values.
+                values = match['except']
+                if not isinstance(values, list):
+                    raise FilterError("'match.except' must be a list of "
+                                      "values")
+                return self._simplify({
+                    'type': 'boolean', 'must': [], 'should': [],
+                    'must_not': [self._parse_match(key, v) for v in values],
+                    'min_should_match': 1})
+            elif not match:
+                raise FilterError("'match' condition has no operand")
+            else:
+                raise FilterError(f"Unsupported match variant: "
+                                  f"{sorted(match)[0]}")
+        else:
+            value = match
+        try:
+            return _intern_match(key, value)
+        except TypeError:
+            # Unhashable match value (e.g. a list); build a fresh node.
+            return self._annotate({'type': 'match', 'key': key,
+                                   'value': value})
+
+    def _parse_range(self, key: str, bounds: Any) -> Dict[str, Any]:
+        if not isinstance(bounds, dict):
+            raise FilterError("'range' must be a dict of bounds")
+        for bound in bounds:
+            if bound not in _RANGE_OPS:
+                raise FilterError(f"Unsupported range bound: {bound}")
+            if not isinstance(bounds[bound], (int, float)):
+                raise FilterError(f"Range bound '{bound}' must be numeric")
+        if bounds and _range_is_empty(bounds):
+            return _always_false()
+        return _intern_range(key, tuple(sorted(bounds.items())))
+
+    def _parse_geo_radius(self, key: str, geo: Any) -> Dict[str, Any]:
+        try:
+            center = geo['center']
+            parsed = {'type': 'geo_radius', 'key': key,
+                      'lat': float(center['lat']),
+                      'lon': float(center['lon']),
+                      'radius': float(geo['radius'])}
+        except (KeyError, TypeError) as e:
+            raise FilterError(f"Malformed geo_radius filter: {e}")
+        return self._annotate(parsed)
+
+    def _parse_geo_bounding_box(self, key: str, box: Any) -> Dict[str, Any]:
+        try:
+            top_left = box['top_left']
+            bottom_right = box['bottom_right']
+            parsed = {'type': 'geo_bounding_box', 'key': key,
+                      'top': float(top_left['lat']),
+                      'left': float(top_left['lon']),
+                      'bottom': float(bottom_right['lat']),
+                      'right': float(bottom_right['lon'])}
+        except (KeyError, TypeError) as e:
+            raise FilterError(f"Malformed geo_bounding_box filter: {e}")
+        return self._annotate(parsed)
+
+    def _parse_is_null(self, key: str, _operand: Any) -> Dict[str, Any]:
+        return _intern_is_null(key)
+
+    def _parse_is_empty(self, key: str, _operand: Any) -> Dict[str, Any]:
+        return _intern_is_empty(key)
+
+    _FIELD_PARSERS = {'match': _parse_match, 'range': _parse_range,
+                      'geo_radius': _parse_geo_radius,
+                      'geo_bounding_box': _parse_geo_bounding_box,
+                      'is_null': _parse_is_null, 'is_empty': _parse_is_empty}
+
+    _LEAF_COMPLEXITY = {'geo_radius': 5, 'geo_bounding_box': 2, 'range': 2,
+                        'always_false': 0, 'always_true': 0}
+
+    # Assumed fraction of points a leaf keeps, absent real statistics.
+    # The executor overrides these with cardinality estimates at run time;
+    # the parse-time numbers only pick a sensible static clause order.
+    _LEAF_SELECTIVITY = {'match': 0.1, 'geo_radius': 0.2,
+                         'geo_bounding_box': 0.2, 'range': 0.3,
+                         'is_null': 0.5, 'is_empty': 0.5,
+                         'has_id': 0.05, 'always_false': 0.0,
+                         'always_true': 1.0}
+
+    def _simplify(self, node: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Algebraic simplification of a freshly built boolean node.
+
+        Nested pure-AND/pure-OR children are flattened into the parent,
+        duplicate clauses are dropped, range clauses on the same field are
+        merged by bound intersection, and provably empty or tautological
+        nodes collapse to always_false / always_true sentinels the
+        executor short-circuits on. Children arrive already simplified,
+        so one bottom-up pass suffices.
+        """
+        min_should = node['min_should_match']
+        must = _flatten_clause(node['must'], 'must')
+        must_not = _dedupe(node['must_not'])
+        if min_should == 1:
+            # With a tally threshold, duplicates and nesting are
+            # semantically significant; only plain OR flattens safely.
+            should = _dedupe(_flatten_clause(node['should'], 'should'))
+        else:
+            should = node['should']
+        must = self._merge_ranges(_dedupe(must))
+
+        if any(child['type'] == 'always_false' for child in must):
+            return _always_false()
+        must = [child for child in must if child['type'] != 'always_true']
+        if should:
+            # A false should child can never contribute to the tally; a
+            # true one always contributes exactly 1, so it comes off both
+            # the list and the threshold.
+            trues = sum(child['type'] == 'always_true' for child in should)
+            should = [child for child in should
+                      if child['type'] not in ('always_false',
+                                               'always_true')]
+            min_should -= trues
+            if min_should < 1:
+                # Clause already satisfied; drop it entirely.
+                should = []
+                min_should = 1
+            elif len(should) < min_should:
+                return _always_false()
+        if any(child['type'] == 'always_true' for child in must_not):
+            return _always_false()
+        must_not = [child for child in must_not
+                    if child['type'] != 'always_false']
+
+        if not must and not should and not must_not:
+            return _always_true()
+        if len(must) == 1 and not should and not must_not:
+            return must[0]
+        if not must and not must_not and len(should) == 1 and min_should == 1:
+            return should[0]
+        # Order clauses for short-circuit evaluation: in an AND, cheap and
+        # selective children first (ascending cost * selectivity); in an OR,
+        # children likely to match first (ascending cost / match chance).
+        # The tally semantics of should are order-independent, so sorting is
+        # always safe, and the canonical order lets structurally equivalent
+        # filters share downstream cache entries.
+        must.sort(key=lambda c: c['complexity'] * c['selectivity'])
+        should.sort(
+            key=lambda c: c['complexity'] / max(c['selectivity'], 0.01))
+        return self._annotate({'type': 'boolean', 'must': must,
+                               'should': should, 'must_not': must_not,
+                               'min_should_match': min_should})
+
+    def _merge_ranges(self,
+                      children: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Intersect multiple AND-ed range clauses on the same field."""
+        by_key: Dict[str, int] = {}
+        merged: List[Dict[str, Any]] = []
+        for child in children:
+            if child['type'] != 'range':
+                merged.append(child)
+                continue
+            slot = by_key.get(child['key'])
+            if slot is None:
+                by_key[child['key']] = len(merged)
+                merged.append(child)
+                continue
+            bounds = dict(merged[slot]['bounds'])
+            for bound, value in child['bounds'].items():
+                if bound in bounds:
+                    fold = max if bound in ('gt', 'gte') else min
+                    bounds[bound] = fold(bounds[bound], value)
+                else:
+                    bounds[bound] = value
+            if _range_is_empty(bounds):
+                merged[slot] = _always_false()
+            else:
+                merged[slot] = _intern_range(child['key'],
+                                             tuple(sorted(bounds.items())))
+        return merged
+
+    @classmethod
+    def _annotate(cls, node: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Attach complexity and referenced fields to a parsed node.
+
+        Children are already annotated when a boolean node is built, so the
+        bottom-up fold here makes estimate_filter_complexity and
+        get_filter_fields O(1) lookups instead of repeated tree walks.
+        """
+        if node['type'] == 'boolean':
+            node['complexity'] = 1 + sum(
+                child['complexity']
+                for clause in ('must', 'should', 'must_not')
+                for child in node[clause])
+            fields: Set[str] = set()
+            for clause in ('must', 'should', 'must_not'):
+                for child in node[clause]:
+                    fields.update(child['fields'])
+            node['fields'] = sorted(fields)
+            selectivity = 1.0
+            for child in node['must']:
+                selectivity *= child['selectivity']
+            if node['should']:
+                selectivity *= min(
+                    1.0, sum(c['selectivity'] for c in node['should']))
+            for child in node['must_not']:
+                selectivity *= 1.0 - child['selectivity']
+            node['selectivity'] = selectivity
+        else:
+            node['complexity'] = cls._LEAF_COMPLEXITY.get(node['type'], 1)
+            node['fields'] = [node['key']] if 'key' in node else []
+            node['selectivity'] = cls._LEAF_SELECTIVITY.get(node['type'], 0.5)
+        return node
+
+    def clear_cache(self) -> None:
+        """Drop cached parse results (primarily for tests)."""
+        self._parse_cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+        _intern_match.cache_clear()
+        _intern_range.cache_clear()
+        _intern_is_null.cache_clear()
+        _intern_is_empty.cache_clear()
+
+    def cache_info(self) -> Dict[str, int]:
+        """Hit/miss counters and occupancy of the parse cache."""
+        return {'hits': self._cache_hits, 'misses': self._cache_misses,
+                'size': len(self._parse_cache),
+                'maxsize': _PARSE_CACHE_SIZE}
+
+    def normalize_ids(self, ids: List[Union[str, int]]) -> List[str]:
+        """Normalize point IDs to their canonical string form."""
+        return [_normalize_id(point_id) if isinstance(point_id, str)
+                else str(point_id) for point_id in ids]
+
+    # -------------------------------------------------------------------------
+    # Analysis
+    # -------------------------------------------------------------------------
+
+    def estimate_filter_complexity(self, parsed: Dict[str, Any]) -> int:
+        """Evaluation cost estimate, precomputed at parse time."""
+        return parsed['complexity']
+
+    def get_filter_fields(self, parsed: Dict[str, Any]) -> Set[str]:
+        """Metadata fields referenced by the tree, precomputed at parse time."""
+        return set(parsed['fields'])
+
+
+# -----------------------------------------------------------------------------
+# Leaf interning
+# -----------------------------------------------------------------------------
+# Every parse of {'key': 'status', 'match': 'active'} used to allocate a
+# fresh five-key dict; filters repeat the same handful of leaves, so shared
+# annotated nodes are handed out instead. Nodes stay plain dicts — the
+# engine and executor key their caches by json.dumps of the tree, which
+# frozen node classes would break — and like cached parse results the
+# shared leaves must be treated as immutable.
+
+@functools.lru_cache(maxsize=4096)
+def _intern_match(key: str, value: Any) -> Dict[str, Any]:
+    # The bloom hint is an int, so the node stays JSON-serializable; it is
+    # only meaningful within this process (str hashes are randomized per
+    # run), which is exactly the lifetime of the signature columns it is
+    # compared against.
+    return FilterParser._annotate({'type': 'match', 'key': key,
+                                   'value': value,
+                                   'bloom': _signature_bit(value)})
+
+
+@functools.lru_cache(maxsize=4096)
+def _intern_range(key: str,
+                  bounds: 'tuple[tuple[str, float], ...]') -> Dict[str, Any]:
+    return FilterParser._annotate({'type': 'range', 'key': key,
+                                   'bounds': dict(bounds)})
+
+
+@functools.lru_cache(maxsize=1024)
+def _intern_is_null(key: str) -> Dict[str, Any]:
+    return FilterParser._annotate({'type': 'is_null', 'key': key})
+
+
+@functools.lru_cache(maxsize=1024)
+def _intern_is_empty(key: str) -> Dict[str, Any]:
+    return FilterParser._annotate({'type': 'is_empty', 'key': key})
+
+
+@functools.lru_cache(maxsize=1)
+def _always_false() -> Dict[str, Any]:
+    return FilterParser._annotate({'type': 'always_false'})
+
+
+@functools.lru_cache(maxsize=1)
+def _always_true() -> Dict[str, Any]:
+    return FilterParser._annotate({'type': 'always_true'})
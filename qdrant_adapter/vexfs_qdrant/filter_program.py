@@ -0,0 +1,292 @@
+"""
+Flat postorder programs compiled from parsed filter trees.
+
+The parser emits nested dicts that the interpreter walks by chasing
+pointers and dispatching on ``'type'`` strings per node per point.
+compile_program lowers a parsed tree once into parallel arrays — an
+int8 opcode column plus int32 child-count, operand and field columns
+with interned field-name and operand tables — so per-point evaluation
+becomes one tight loop over a postorder instruction list with a small
+boolean stack. Programs are cached by the canonical JSON of the parsed
+tree, the same key the engine and executor caches already use.
+"""
+
+import functools
+import json
+import math
+
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+
+from ._geo_kernels import _EARTH_RADIUS_M, _use_equirect
+from .filter_parser import _canonical_key
+
+# Leaf opcodes push one boolean; combinators pop ``argc`` and push one.
+OP_MATCH = 1
+OP_RANGE = 2
+OP_GEO_RADIUS = 3
+OP_GEO_BBOX = 4
+OP_IS_NULL = 5
+OP_IS_EMPTY = 6
+OP_HAS_ID = 7
+OP_FALSE = 8
+OP_TRUE = 9
+OP_AND = 10
+OP_AT_LEAST = 11
+OP_NONE_OF = 12
+
+_PROGRAM_CACHE_SIZE = 1024
+_program_cache: Dict[str, 'FilterProgram'] = {}
+
+
+@functools.lru_cache(maxsize=1024)
+def _radius_constants(lat: float, lon: float, radius: float) -> tuple:
+    """Precomputed center terms and path choice for one geo_radius."""
+    clat_r = math.radians(lat)
+    angular = radius / _EARTH_RADIUS_M
+    clamped = min(angular, math.pi)
+    return (clat_r, math.radians(lon), math.cos(clat_r),
+            math.sin(clamped / 2.0) ** 2, angular * angular,
+            _use_equirect(lat, radius))
+
+
+class FilterProgram:
+    """
+    One parsed filter lowered to postorder instruction arrays.
+
+    ``ops``/``argc``/``operand``/``field_ids`` are the structure-of-arrays
+    form for vectorized executors; ``matches`` runs the same program
+    against a single point's metadata dict.
+    """
+
+    __slots__ = ('ops', 'argc', 'operand', 'field_ids', 'fields', 'values',
+                 '_steps')
+
+    def __init__(self, ops: List[int], argc: List[int], operand: List[int],
+                 field_ids: List[int], fields: Tuple[str, ...],
+                 values: Tuple[Any, ...]):
+        self.ops = np.asarray(ops, dtype=np.int8)
+        self.argc = np.asarray(argc, dtype=np.int32)
+        self.operand = np.asarray(operand, dtype=np.int32)
+        self.field_ids = np.asarray(field_ids, dtype=np.int32)
+        self.fields = fields
+        self.values = values
+        # Plain tuples iterate markedly faster than numpy scalars in the
+        # per-point loop; the arrays stay the canonical program form.
+        self._steps = tuple(zip(ops, argc, operand, field_ids))
+
+    def __len__(self) -> int:
+        return len(self._steps)
+
+    def matches(self, metadata: Dict[str, Any],
+                point_id: Optional[str] = None) -> bool:
+        """Evaluate the program against one point's metadata."""
+        fields = self.fields
+        values = self.values
+        stack: List[bool] = []
+        push = stack.append
+        for op, argc, operand, field_id in self._steps:
+            if op == OP_MATCH:
+                value = metadata.get(fields[field_id])
+                wanted = values[operand]
+                if isinstance(value, list):
+                    push(wanted in value)
+                else:
+                    push(value == wanted)
+            elif op == OP_RANGE:
+                value = metadata.get(fields[field_id])
+                if not isinstance(value, (int, float)) or \
+                        isinstance(value, bool):
+                    push(False)
+                    continue
+                gt, gte, lt, lte = values[operand]
+                push((gt is None or value > gt) and
+                     (gte is None or value >= gte) and
+                     (lt is None or value < lt) and
+                     (lte is None or value <= lte))
+            elif op == OP_AND:
+                result = True
+                for _ in range(argc):
+                    result &= stack.pop()
+                push(result)
+            elif op == OP_AT_LEAST:
+                tally = 0
+                for _ in range(argc):
+                    tally += stack.pop()
+                push(tally >= operand)
+            elif op == OP_NONE_OF:
+                result = True
+                for _ in range(argc):
+                    result &= not stack.pop()
+                push(result)
+            elif op == OP_GEO_RADIUS:
+                push(self._geo_within(metadata.get(fields[field_id]),
+                                      values[operand]))
+            elif op == OP_GEO_BBOX:
+                push(self._bbox_within(metadata.get(fields[field_id]),
+                                       values[operand]))
+            elif op == OP_IS_NULL:
+                push(metadata.get(fields[field_id]) is None)
+            elif op == OP_IS_EMPTY:
+                value = metadata.get(fields[field_id])
+                push(value is None or value == [] or value == '' or
+                     value == {})
+            elif op == OP_HAS_ID:
+                push(point_id is not None and point_id in values[operand])
+            elif op == OP_FALSE:
+                push(False)
+            else:
+                push(True)
+        return stack[-1]
+
+    @staticmethod
+    def _geo_within(location: Any, constants: tuple) -> bool:
+        if not isinstance(location, dict):
+            return False
+        lat = location.get('lat')
+        lon = location.get('lon')
+        if lat is None or lon is None:
+            return False
+        clat_r, clon_r, cos_clat, a_threshold, angular_sq, equirect = \
+            constants
+        plat_r = math.radians(lat)
+        if equirect:
+            dlat = plat_r - clat_r
+            dlon = abs(math.radians(lon) - clon_r)
+            if dlon > math.pi:
+                dlon = 2.0 * math.pi - dlon
+            dx = dlon * cos_clat
+            return dlat * dlat + dx * dx <= angular_sq
+        a = (math.sin((plat_r - clat_r) / 2.0) ** 2 +
+             cos_clat * math.cos(plat_r) *
+             math.sin((math.radians(lon) - clon_r) / 2.0) ** 2)
+        return a <= a_threshold
+
+    @staticmethod
+    def _bbox_within(location: Any,
+                     box: 'tuple[float, float, float, float]') -> bool:
+        if not isinstance(location, dict):
+            return False
+        lat = location.get('lat')
+        lon = location.get('lon')
+        if lat is None or lon is None:
+            return False
+        top, left, bottom, right = box
+        if not bottom <= lat <= top:
+            return False
+        if left <= right:
+            return left <= lon <= right
+        # Box crosses the antimeridian.
+        return lon >= left or lon <= right
+
+
+class _Emitter:
+    """Accumulates program columns during one postorder traversal."""
+
+    def __init__(self) -> None:
+        self.ops: List[int] = []
+        self.argc: List[int] = []
+        self.operand: List[int] = []
+        self.field_ids: List[int] = []
+        self._fields: Dict[str, int] = {}
+        self._values: List[Any] = []
+
+    def field(self, name: str) -> int:
+        field_id = self._fields.get(name)
+        if field_id is None:
+            field_id = len(self._fields)
+            self._fields[name] = field_id
+        return field_id
+
+    def value(self, operand: Any) -> int:
+        self._values.append(operand)
+        return len(self._values) - 1
+
+    def emit(self, op: int, argc: int = 0, operand: int = -1,
+             field_id: int = -1) -> None:
+        self.ops.append(op)
+        self.argc.append(argc)
+        self.operand.append(operand)
+        self.field_ids.append(field_id)
+
+    def finish(self) -> FilterProgram:
+        return FilterProgram(self.ops, self.argc, self.operand,
+                             self.field_ids, tuple(self._fields),
+                             tuple(self._values))
+
+
+def _emit_node(node: Dict[str, Any], out: _Emitter) -> None:
+    node_type = node['type']
+    if node_type == 'boolean':
+        groups = 0
+        for child in node['must']:
+            _emit_node(child, out)
+        groups += len(node['must'])
+        if node['should']:
+            for child in node['should']:
+                _emit_node(child, out)
+            out.emit(OP_AT_LEAST, argc=len(node['should']),
+                     operand=node.get('min_should_match', 1))
+            groups += 1
+        if node['must_not']:
+            for child in node['must_not']:
+                _emit_node(child, out)
+            out.emit(OP_NONE_OF, argc=len(node['must_not']))
+            groups += 1
+        if groups == 0:
+            out.emit(OP_TRUE)
+        elif groups > 1:
+            out.emit(OP_AND, argc=groups)
+    elif node_type == 'match':
+        out.emit(OP_MATCH, operand=out.value(node['value']),
+                 field_id=out.field(node['key']))
+    elif node_type == 'range':
+        bounds = node['bounds']
+        out.emit(OP_RANGE,
+                 operand=out.value((bounds.get('gt'), bounds.get('gte'),
+                                    bounds.get('lt'), bounds.get('lte'))),
+                 field_id=out.field(node['key']))
+    elif node_type == 'geo_radius':
+        constants = _radius_constants(node['lat'], node['lon'],
+                                      node['radius'])
+        out.emit(OP_GEO_RADIUS, operand=out.value(constants),
+                 field_id=out.field(node['key']))
+    elif node_type == 'geo_bounding_box':
+        out.emit(OP_GEO_BBOX,
+                 operand=out.value((node['top'], node['left'],
+                                    node['bottom'], node['right'])),
+                 field_id=out.field(node['key']))
+    elif node_type == 'is_null':
+        out.emit(OP_IS_NULL, field_id=out.field(node['key']))
+    elif node_type == 'is_empty':
+        out.emit(OP_IS_EMPTY, field_id=out.field(node['key']))
+    elif node_type == 'has_id':
+        out.emit(OP_HAS_ID, operand=out.value(frozenset(node['ids'])))
+    elif node_type == 'always_false':
+        out.emit(OP_FALSE)
+    elif node_type == 'always_true':
+        out.emit(OP_TRUE)
+    else:
+        raise ValueError(f"Cannot compile filter node type: {node_type}")
+
+
+def compile_program(parsed: Dict[str, Any]) -> FilterProgram:
+    """Lower one parsed filter tree into a flat postorder program."""
+    out = _Emitter()
+    _emit_node(parsed, out)
+    return out.finish()
+
+
+def get_program(parsed: Dict[str, Any]) -> FilterProgram:
+    """Cached compile_program, keyed by the canonical parsed-tree JSON."""
+    try:
+        key = _canonical_key(parsed)
+    except TypeError:
+        return compile_program(parsed)
+    program = _program_cache.get(key)
+    if program is None:
+        program = compile_program(parsed)
+        if len(_program_cache) >= _PROGRAM_CACHE_SIZE:
+            _program_cache.pop(next(iter(_program_cache)))
+        _program_cache[key] = program
+    return program
@@ -0,0 +1,538 @@
+"""
+gRPC streaming service for the Qdrant adapter.
+
+Serves the Qdrant gRPC streaming RPCs on top of VexFSKernelClient,
+complementing the HTTP dialect in rust/src/dialects/qdrant.rs: the
+unified server answers unary HTTP clients, while this module streams
+large result sets and ingest batches over grpc.aio.
+
+Responses are built destination-first: scored points are allocated
+inside the response message's repeated field via ``add()`` and scalar
+fields set by plain assignment, instead of building detached protobuf
+messages and ``CopyFrom``-ing them in, which costs three allocations
+and two deep copies per hit.
+
+grpcio and the qdrant-client protobuf bindings are optional (the
+``grpc`` extra); the module imports without them and
+QdrantStreamingService raises VexFSError on construction when they are
+missing.
+"""
+
+import asyncio
+import functools
+import operator
+import resource
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Union
+
+try:
+    import grpc  # noqa: F401  -- server wiring lives with the caller
+    from google.protobuf import struct_pb2
+    from qdrant_client import grpc as qdrant_pb2
+except ImportError:
+    grpc = None
+    struct_pb2 = None
+    qdrant_pb2 = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from .kernel_client import VexFSError, VexFSKernelClient, _hash_point_id
+
+
+@dataclass(slots=True)
+class _PointData:
+    """
+    One decoded upsert point.
+
+    A slots instance instead of a per-point dict: tens of thousands of
+    buffered points would otherwise each carry a hash table. The mapping
+    shims below let insert_points consume these unchanged.
+    """
+    id: int
+    vector: Any
+    payload: Optional[Dict[str, Any]] = None
+
+    def __getitem__(self, key: str) -> Any:
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+# Reading RSS syscalls into /proc; sampling once per TTL is plenty for
+# the soft-limit check the streaming loops run per batch.
+_PROCESS = psutil.Process() if psutil is not None else None
+_MEM_SAMPLE_TTL_S = 0.1
+
+# How long a streamed upsert waits for more requests before flushing a
+# partially filled buffer.
+_UPSERT_FILL_WINDOW_S = 0.01
+
+# Upper bound on insert batches in flight per upsert stream; beyond
+# this the decoder waits for a slot instead of queueing unboundedly.
+_MAX_INFLIGHT_FLUSHES = 4
+_last_mem_check = float('-inf')
+_last_mem_mb = 0.0
+
+
+def get_memory_usage_mb() -> float:
+    """Resident set size of this process in MiB, sampled at most per TTL."""
+    global _last_mem_check, _last_mem_mb
+    now = time.monotonic()
+    if now - _last_mem_check >= _MEM_SAMPLE_TTL_S:
+        if _PROCESS is not None:
+            _last_mem_mb = _PROCESS.memory_info().rss / (1024 * 1024)
+        else:
+            # Fallback: peak RSS from getrusage; ru_maxrss is KiB on Linux.
+            _last_mem_mb = \
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        _last_mem_check = now
+    return _last_mem_mb
+
+
+@functools.lru_cache(maxsize=4096)
+def _uuid_to_int(point_id: str) -> int:
+    """Stable 64-bit vector ID for a UUID-style point ID; memoized."""
+    return _hash_point_id(point_id)
+
+
+def _convert_point_id(point_id: Union[int, str]) -> int:
+    """
+    Map a Qdrant point ID (unsigned int or UUID string) to a vector ID.
+
+    String IDs go through the same stable hash the insert path uses
+    (XXH3 or blake2b), never the per-interpreter salted builtin hash:
+    the mapping must agree across processes and with points inserted
+    through VexFSKernelClient directly.
+    """
+    if isinstance(point_id, int):
+        return point_id
+    if point_id.isdigit():
+        return int(point_id)
+    return _uuid_to_int(point_id)
+
+
+def _set_struct_value(value_pb: Any, value: Any) -> None:
+    """Assign one Python payload value onto a protobuf Value in place."""
+    # bool before (int, float): bool subclasses int and would otherwise
+    # be mis-encoded as number_value.
+    if isinstance(value, bool):
+        value_pb.bool_value = value
+    elif isinstance(value, (int, float)):
+        value_pb.number_value = value
+    elif isinstance(value, str):
+        value_pb.string_value = value
+    elif value is None:
+        value_pb.null_value = struct_pb2.NULL_VALUE
+    elif isinstance(value, list):
+        values = value_pb.list_value.values
+        for item in value:
+            _set_struct_value(values.add(), item)
+    elif isinstance(value, dict):
+        fields = value_pb.struct_value.fields
+        for key, item in value.items():
+            _set_struct_value(fields[key], item)
+    else:
+        value_pb.string_value = str(value)
+
+
+def _merge_payload(fields: Any, payload: Dict[str, Any]) -> None:
+    """Populate a message's payload fields map from a payload dict."""
+    for key, value in payload.items():
+        _set_struct_value(fields[key], value)
+
+
+def _compile_payload_writers(sample: Dict[str, Any]) -> tuple:
+    """
+    Specialized field writers for one payload schema.
+
+    Collections keep a fixed payload shape in practice, so the
+    isinstance chain in _set_struct_value runs once per schema here
+    instead of once per field per point; compound or unexpected types
+    keep the generic writer. Type drift raises TypeError at protobuf
+    assignment, which the caller treats as a schema change.
+    """
+    writers = []
+    for key, value in sample.items():
+        if isinstance(value, bool):
+            def write(fields: Any, val: Any, _key: str = key) -> None:
+                fields[_key].bool_value = val
+        elif isinstance(value, (int, float)):
+            def write(fields: Any, val: Any, _key: str = key) -> None:
+                fields[_key].number_value = val
+        elif isinstance(value, str):
+            def write(fields: Any, val: Any, _key: str = key) -> None:
+                fields[_key].string_value = val
+        else:
+            def write(fields: Any, val: Any, _key: str = key) -> None:
+                _set_struct_value(fields[_key], val)
+        writers.append((key, write))
+    return tuple(writers)
+
+
+def _struct_value_to_py(value_pb: Any) -> Any:
+    """
+    Decode one protobuf Value into its Python form.
+
+    A single WhichOneof('kind') descriptor lookup plus a handler-table
+    hit replaces the per-field HasField chain, which pays reflection
+    cost once per candidate kind.
+    """
+    getter = _VALUE_GETTERS.get(value_pb.WhichOneof('kind'))
+    return getter(value_pb) if getter is not None else None
+
+
+_VALUE_GETTERS = {
+    'string_value': operator.attrgetter('string_value'),
+    'number_value': operator.attrgetter('number_value'),
+    'bool_value': operator.attrgetter('bool_value'),
+    'null_value': lambda value_pb: None,
+    'list_value': lambda value_pb: [
+        _struct_value_to_py(item) for item in value_pb.list_value.values],
+    'struct_value': lambda value_pb: {
+        key: _struct_value_to_py(item)
+        for key, item in value_pb.struct_value.fields.items()},
+}
+
+
+class QdrantStreamingService:
+    """
+    Async streaming handlers for the Qdrant gRPC API.
+
+    One instance wraps one VexFSKernelClient. Handlers are async
+    generators yielding protobuf response batches, ready to plug into a
+    grpc.aio servicer; server wiring stays with the embedding process.
+    """
+
+    def __init__(self, vexfs_client: VexFSKernelClient,
+                 batch_size: int = 128,
+                 memory_soft_limit_mb: float = 1024.0,
+                 upsert_watermark: int = 1024) -> None:
+        """
+        Args:
+            vexfs_client: Open kernel client the handlers operate through
+            batch_size: Default number of points per streamed response
+            memory_soft_limit_mb: RSS above which streaming loops back off
+                between batches instead of a bare cooperative yield
+            upsert_watermark: Buffered points per collection above which
+                a streamed upsert flushes to the kernel
+
+        Raises:
+            VexFSError: If the grpc extra (grpcio, qdrant-client) is not
+                installed
+        """
+        if qdrant_pb2 is None:
+            raise VexFSError(
+                "gRPC streaming requires the 'grpc' extra "
+                "(grpcio, qdrant-client)")
+        self.vexfs_client = vexfs_client
+        self.batch_size = batch_size
+        self.memory_soft_limit_mb = memory_soft_limit_mb
+        self.upsert_watermark = upsert_watermark
+        # Default vector name observed per collection; see _decode_point.
+        self._vector_name_cache: Dict[str, str] = {}
+        # Compiled payload writers per collection; see _write_payload.
+        self._payload_writers: Dict[str, tuple] = {}
+
+    def _write_payload(self, collection: str, fields: Any,
+                       payload: Dict[str, Any]) -> None:
+        """
+        Populate payload fields via the collection's compiled writers.
+
+        The writer list is compiled from the first payload seen per
+        collection; points whose keys or value types drift from that
+        schema recompile on the next point and fall back to the generic
+        per-value dispatch for this one.
+        """
+        writers = self._payload_writers.get(collection)
+        if writers is None or len(writers) != len(payload):
+            writers = _compile_payload_writers(payload)
+            self._payload_writers[collection] = writers
+        try:
+            for key, write in writers:
+                write(fields, payload[key])
+        except (KeyError, TypeError):
+            del self._payload_writers[collection]
+            _merge_payload(fields, payload)
+
+    def should_yield_control(self) -> bool:
+        """Whether streaming loops should back off for memory pressure."""
+        return get_memory_usage_mb() >= self.memory_soft_limit_mb
+
+    async def _pace(self) -> None:
+        """
+        Cooperative yield between streamed batches.
+
+        sleep(0) reschedules without a timer wait, so downstream speed
+        sets the throughput ceiling; under memory pressure the loop backs
+        off long enough for the consumer to drain buffered responses.
+        """
+        await asyncio.sleep(0.01 if self.should_yield_control() else 0)
+
+    async def stream_search_results(
+            self, collection: str, query_vector: Sequence[float],
+            limit: int = 100,
+            batch_size: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Yield SearchResponse batches for one k-NN query.
+
+        Each scored point is allocated directly inside the response's
+        repeated result field and its id/score set by assignment; the
+        payload submessage is never touched for payload-less hits, so
+        protobuf skips creating it.
+        """
+        batch_size = batch_size or self.batch_size
+        # The IOCTL blocks for the whole search; run it on a worker
+        # thread so the event loop keeps serving other streams.
+        results = await asyncio.to_thread(self.vexfs_client.search_vectors,
+                                          collection, query_vector,
+                                          limit=limit)
+        # One response message per stream, cleared between batches:
+        # clearing the repeated field in place reuses the message's
+        # storage instead of reallocating the container every batch. The
+        # generator only resumes after the consumer is done with the
+        # yielded message, so reuse cannot clobber an in-flight batch.
+        response = qdrant_pb2.SearchResponse()
+        for start in range(0, len(results), batch_size):
+            del response.result[:]
+            add_point = response.result.add
+            for result in results[start:start + batch_size]:
+                point = add_point()
+                point.id.num = result.id
+                point.score = result.score
+                if result.payload:
+                    _merge_payload(point.payload.fields, result.payload)
+            yield response
+            await self._pace()
+
+    async def stream_get_points(
+            self, collection: str, point_ids: Sequence[Union[int, str]],
+            with_vectors: bool = False,
+            batch_size: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Yield GetResponse batches for a set of point IDs.
+
+        Retrieved points are built in place like search hits: the
+        payload submessage is only touched when there are fields to set,
+        so payload-less points (the common case until payload storage
+        lands in the kernel interface) allocate no Struct at all, and
+        vector data extends the autocreated submessage chain directly
+        instead of round-tripping through detached Vector wrappers.
+        """
+        batch_size = batch_size or self.batch_size
+        batches = [point_ids[start:start + batch_size]
+                   for start in range(0, len(point_ids), batch_size)]
+
+        def fetch(batch: Sequence[Union[int, str]]) -> List[Dict[str, Any]]:
+            return self.vexfs_client.get_vector_metadata(
+                collection, [_convert_point_id(p) for p in batch])
+
+        task = (asyncio.create_task(asyncio.to_thread(fetch, batches[0]))
+                if batches else None)
+        response = qdrant_pb2.GetResponse()
+        try:
+            for index in range(len(batches)):
+                records = await task
+                # Kick off the next fetch before converting this batch so
+                # kernel I/O overlaps protobuf conversion and the consumer
+                # draining the yielded response.
+                task = (asyncio.create_task(
+                            asyncio.to_thread(fetch, batches[index + 1]))
+                        if index + 1 < len(batches) else None)
+                del response.result[:]
+                add_point = response.result.add
+                for record in records:
+                    point = add_point()
+                    point.id.num = record['id']
+                    payload = record.get('payload')
+                    if payload:
+                        self._write_payload(collection,
+                                            point.payload.fields, payload)
+                    if with_vectors and record.get('vector') is not None:
+                        # Destination-passing: extend() on the autocreated
+                        # repeated float field hits protobuf's scalar fast
+                        # path; no Vector/Vectors temporaries, no CopyFrom.
+                        point.vectors.vector.data.extend(record['vector'])
+                yield response
+                await self._pace()
+        finally:
+            # Consumer may abandon the stream mid-flight; don't leak the
+            # prefetch task.
+            if task is not None:
+                task.cancel()
+
+    async def stream_scroll_points(
+            self, collection: str, offset: int = 0,
+            limit: Optional[int] = None,
+            batch_size: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Yield ScrollResponse batches walking a collection in ID order.
+
+        Pages come from the kernel client's cursor-based scroll, so the
+        handler does work proportional to the records returned rather
+        than the ID range walked; the next page is prefetched while the
+        current one is converted, and payloads are populated in place
+        exactly as in stream_get_points.
+        """
+        batch_size = batch_size or self.batch_size
+        remaining = limit
+
+        def fetch(cursor: Optional[int], count: int):
+            return self.vexfs_client.scroll(collection, cursor, count)
+
+        def page_size() -> int:
+            return (batch_size if remaining is None
+                    else min(batch_size, remaining))
+
+        cursor = offset or None
+        task = asyncio.create_task(asyncio.to_thread(fetch, cursor,
+                                                     page_size()))
+        response = qdrant_pb2.ScrollResponse()
+        try:
+            while True:
+                records, cursor = await task
+                task = None
+                if not records:
+                    break
+                if remaining is not None:
+                    remaining -= len(records)
+                if cursor is not None and (remaining is None
+                                           or remaining > 0):
+                    task = asyncio.create_task(
+                        asyncio.to_thread(fetch, cursor, page_size()))
+                del response.result[:]
+                response.ClearField('next_page_offset')
+                add_point = response.result.add
+                for record in records:
+                    point = add_point()
+                    point.id.num = record['id']
+                    payload = record.get('payload')
+                    if payload:
+                        self._write_payload(collection,
+                                            point.payload.fields, payload)
+                if task is not None:
+                    response.next_page_offset.num = cursor
+                yield response
+                await self._pace()
+                if task is None:
+                    break
+        finally:
+            if task is not None:
+                task.cancel()
+
+    def _decode_point(self, point: Any, collection: str) -> _PointData:
+        """Decode one protobuf PointStruct into an insert_points entry."""
+        if point.id.WhichOneof('point_id_options') == 'num':
+            point_id = point.id.num
+        else:
+            point_id = _convert_point_id(point.id.uuid)
+        vectors = point.vectors
+        if vectors.WhichOneof('vectors_options') == 'vectors':
+            # Named vectors: protobuf map access pays a descriptor lookup
+            # per subscript, so resolve the name once and index the map
+            # once. Collections use one vector name in practice; remember
+            # it so later points skip the key iteration entirely.
+            named = vectors.vectors.vectors
+            if not named:
+                raise VexFSError(
+                    f"Upsert point {point_id} has no named vectors")
+            name = self._vector_name_cache.get(collection)
+            if name is None or name not in named:
+                name = next(iter(named))
+                self._vector_name_cache[collection] = name
+            data = named[name].data
+        else:
+            data = vectors.vector.data
+        # One contiguous float32 copy out of the repeated field;
+        # materializing a Python list would box every element.
+        # insert_points stacks these with np.asarray unchanged.
+        payload = None
+        if point.payload:
+            payload = {key: _struct_value_to_py(value)
+                       for key, value in point.payload.items()}
+        return _PointData(id=point_id,
+                          vector=np.asarray(data, dtype=np.float32),
+                          payload=payload)
+
+    async def stream_upsert_points(self, request_iterator: Any) -> int:
+        """
+        Consume a client stream of upsert requests.
+
+        Points are decoded — payload values through the WhichOneof
+        handler table, string IDs through the stable hash — into
+        per-collection buffers rather than inserted request-by-request:
+        a buffer flushes when it reaches the high watermark, and a
+        stream that goes idle for the fill window flushes whatever is
+        pending. Many small requests thus amortize into one kernel
+        round-trip each watermark, without stalling interactive clients
+        behind a full buffer. Flushes run as worker-thread tasks with at
+        most _MAX_INFLIGHT_FLUSHES in flight, so kernel insert latency
+        overlaps decoding the next requests. Returns the total number of
+        points inserted; the servicer wraps it in its acknowledgement
+        message.
+        """
+        pending = 0
+        buffers: Dict[str, List[_PointData]] = {}
+        iterator = request_iterator.__aiter__()
+        inflight: 'set[asyncio.Task]' = set()
+        flush_tasks: 'List[asyncio.Task]' = []
+
+        async def flush(name: str) -> None:
+            nonlocal pending
+            points = buffers.pop(name, None)
+            if not points:
+                return
+            pending -= len(points)
+            while len(inflight) >= _MAX_INFLIGHT_FLUSHES:
+                await asyncio.wait(inflight,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            task = asyncio.create_task(asyncio.to_thread(
+                self.vexfs_client.insert_points, name, points))
+            inflight.add(task)
+            task.add_done_callback(inflight.discard)
+            flush_tasks.append(task)
+
+        request_task: Optional[asyncio.Task] = None
+        try:
+            while True:
+                if request_task is None:
+                    request_task = asyncio.ensure_future(iterator.__anext__())
+                try:
+                    if pending:
+                        # Opportunistically pull more requests before
+                        # flushing; an idle stream flushes what it has.
+                        # The shield keeps the pull alive across the
+                        # timeout — cancelling __anext__ would kill the
+                        # generator and drop the next request — so a
+                        # timed-out pull is re-awaited after the flush.
+                        request = await asyncio.wait_for(
+                            asyncio.shield(request_task),
+                            timeout=_UPSERT_FILL_WINDOW_S)
+                    else:
+                        request = await request_task
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    for name in list(buffers):
+                        await flush(name)
+                    continue
+                request_task = None
+                name = request.collection_name
+                buffer = buffers.setdefault(name, [])
+                for point in request.points:
+                    buffer.append(self._decode_point(point, name))
+                pending += len(request.points)
+                if len(buffer) >= self.upsert_watermark:
+                    await flush(name)
+                await self._pace()
+        finally:
+            if request_task is not None:
+                request_task.cancel()
+        for name in list(buffers):
+            await flush(name)
+        return sum(await asyncio.gather(*flush_tasks))
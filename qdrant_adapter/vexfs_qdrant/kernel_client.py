@@ -0,0 +1,844 @@
+"""
+VexFS Kernel Client
+
+Low-level Python client for the VexFS v2 vector IOCTL interface. This module
+mirrors the structures defined in the kernel UAPI header (vexfs_uapi.h) and
+provides batch insert and k-NN search on top of a mounted VexFS v2 volume.
+
+KERNEL COMPATIBILITY: vector data crosses the user/kernel boundary as raw
+IEEE 754 bit patterns (uint32) because the kernel module avoids floating-point
+operations entirely.
+"""
+
+import errno
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import types
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    # Optional Cython fast path; built via setup.py when Cython is available.
+    from . import _vexfs_client
+except ImportError:
+    _vexfs_client = None
+
+try:
+    # SIMD-accelerated XXH3 when available.
+    from xxhash import xxh3_64_intdigest as _xxh3_64
+except ImportError:
+    _xxh3_64 = None
+
+if _xxh3_64 is None:
+    import hashlib
+
+    def _hash_point_id(point_id: str) -> int:
+        """Stable 64-bit hash of a string point ID (blake2b fallback)."""
+        digest = hashlib.blake2b(point_id.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little') & 0x7FFFFFFFFFFFFFFF
+else:
+    def _hash_point_id(point_id: str) -> int:
+        """Stable 64-bit hash of a string point ID (XXH3, SIMD lanes)."""
+        return _xxh3_64(point_id.encode()) & 0x7FFFFFFFFFFFFFFF
+
+
+# =============================================================================
+# IOCTL command construction (mirrors <linux/ioctl.h>)
+# =============================================================================
+
+_IOC_NRBITS = 8
+_IOC_TYPEBITS = 8
+_IOC_SIZEBITS = 14
+_IOC_NRSHIFT = 0
+_IOC_TYPESHIFT = _IOC_NRSHIFT + _IOC_NRBITS
+_IOC_SIZESHIFT = _IOC_TYPESHIFT + _IOC_TYPEBITS
+_IOC_DIRSHIFT = _IOC_SIZESHIFT + _IOC_SIZEBITS
+
+_IOC_NONE = 0
+_IOC_WRITE = 1
+_IOC_READ = 2
+
+
+def _IOC(direction: int, ioc_type: str, nr: int, size: int) -> int:
+    return ((direction << _IOC_DIRSHIFT) |
+            (ord(ioc_type) << _IOC_TYPESHIFT) |
+            (nr << _IOC_NRSHIFT) |
+            (size << _IOC_SIZESHIFT))
+
+
+def _IOW(ioc_type: str, nr: int, size: int) -> int:
+    return _IOC(_IOC_WRITE, ioc_type, nr, size)
+
+
+def _IOR(ioc_type: str, nr: int, size: int) -> int:
+    return _IOC(_IOC_READ, ioc_type, nr, size)
+
+
+def _IOWR(ioc_type: str, nr: int, size: int) -> int:
+    return _IOC(_IOC_READ | _IOC_WRITE, ioc_type, nr, size)
+
+
+# =============================================================================
+# VexFS v2 UAPI constants (must stay in sync with vexfs_uapi.h)
+# =============================================================================
+
+VEXFS_IOC_MAGIC = 'V'
+
+VEXFS_VECTOR_FLOAT32 = 0x01
+VEXFS_VECTOR_FLOAT16 = 0x02
+VEXFS_VECTOR_INT8 = 0x03
+VEXFS_VECTOR_BINARY = 0x04
+
+VEXFS_SEARCH_EUCLIDEAN = 0x00
+VEXFS_SEARCH_COSINE = 0x01
+VEXFS_SEARCH_DOT_PRODUCT = 0x02
+
+VEXFS_STORAGE_DENSE = 0x00
+
+VEXFS_COMPRESS_NONE = 0x00
+
+VEXFS_INSERT_APPEND = 0x02
+
+VEXFS_VECTOR_FILE_INFO_SIZE = 40
+VEXFS_VECTOR_SEARCH_REQUEST_SIZE = 48
+VEXFS_BATCH_INSERT_REQUEST_SIZE = 32
+VEXFS_BATCH_SEARCH_REQUEST_SIZE = 48
+
+VEXFS_IOC_SET_VECTOR_META = _IOW(VEXFS_IOC_MAGIC, 1, VEXFS_VECTOR_FILE_INFO_SIZE)
+VEXFS_IOC_GET_VECTOR_META = _IOR(VEXFS_IOC_MAGIC, 2, VEXFS_VECTOR_FILE_INFO_SIZE)
+VEXFS_IOC_VECTOR_SEARCH = _IOWR(VEXFS_IOC_MAGIC, 3, VEXFS_VECTOR_SEARCH_REQUEST_SIZE)
+VEXFS_IOC_BATCH_INSERT = _IOW(VEXFS_IOC_MAGIC, 4, VEXFS_BATCH_INSERT_REQUEST_SIZE)
+
+# Batched multi-query search. Command number 16 is the first free slot above
+# the legacy search commands (10-15) that share the 'V' magic.
+VEXFS_IOC_VECTOR_SEARCH_BATCH = _IOWR(VEXFS_IOC_MAGIC, 16, VEXFS_BATCH_SEARCH_REQUEST_SIZE)
+
+# Staging-ring insert: vector bits and IDs are written into a shared mmap'd
+# region of the vector file and the request carries ring offsets instead of
+# user pointers, removing one of the two copies on the insert path.
+VEXFS_RING_INSERT_REQUEST_SIZE = 32
+VEXFS_IOC_BATCH_INSERT_RING = _IOW(VEXFS_IOC_MAGIC, 17, VEXFS_RING_INSERT_REQUEST_SIZE)
+VEXFS_STAGING_RING_SIZE = 4 * 1024 * 1024
+
+# struct vexfs_vector_file_info, packed once at import. The previous inline
+# format dropped the trailing alignment_bytes field and silently sent a
+# 36-byte payload for a 40-byte struct; assert loudly so an ABI drift fails
+# at import time instead of corrupting metadata.
+_META_STRUCT = struct.Struct('<IIIIQQII')
+assert _META_STRUCT.size == VEXFS_VECTOR_FILE_INFO_SIZE, \
+    "vexfs_vector_file_info layout drifted from the kernel UAPI"
+
+_DISTANCE_TYPES = {
+    'euclidean': VEXFS_SEARCH_EUCLIDEAN,
+    'cosine': VEXFS_SEARCH_COSINE,
+    'dot': VEXFS_SEARCH_DOT_PRODUCT,
+}
+
+
+# Shared read-only payload sentinel for metadata records; immutable so it is
+# safe to alias across results instead of allocating a dict per point.
+_EMPTY_PAYLOAD: 'types.MappingProxyType' = types.MappingProxyType({})
+
+
+class VexFSError(Exception):
+    """Raised when a VexFS kernel operation fails."""
+    pass
+
+
+def get_vexfs_distance_type(distance: str) -> int:
+    """
+    Map a Qdrant-style distance name to the VEXFS_SEARCH_* constant.
+
+    Args:
+        distance: Distance metric name ("euclidean", "cosine" or "dot")
+
+    Returns:
+        VEXFS_SEARCH_* integer constant
+
+    Raises:
+        VexFSError: If the distance metric is not supported
+    """
+    try:
+        return _DISTANCE_TYPES[distance.lower()]
+    except KeyError:
+        raise VexFSError(f"Unsupported distance metric: {distance}")
+
+
+def float_to_ieee754_bits(value: float) -> int:
+    """Convert a Python float to its IEEE 754 single-precision bit pattern."""
+    return struct.unpack('<I', struct.pack('<f', value))[0]
+
+
+def prepare_batch_vectors_for_kernel(vectors: Sequence[Sequence[float]]) -> List[int]:
+    """
+    Flatten a batch of float vectors into the IEEE 754 uint32 representation
+    expected by the kernel module.
+
+    This is the slow fallback for arbitrary Python sequences; hot paths
+    reinterpret contiguous float32 numpy arrays with .view(np.uint32)
+    instead, which is zero-copy.
+
+    Args:
+        vectors: Sequence of equal-length float vectors
+
+    Returns:
+        Flat list of uint32 bit patterns, row-major
+    """
+    bits = []
+    for vector in vectors:
+        for value in vector:
+            bits.append(float_to_ieee754_bits(value))
+    return bits
+
+
+@dataclass(slots=True)
+class VectorFileInfo:
+    """Per-collection metadata mirroring struct vexfs_vector_file_info."""
+    dimensions: int
+    element_type: int = VEXFS_VECTOR_FLOAT32
+    vector_count: int = 0
+    storage_format: int = VEXFS_STORAGE_DENSE
+    data_offset: int = 0
+    index_offset: int = 0
+    compression_type: int = VEXFS_COMPRESS_NONE
+    alignment_bytes: int = 32
+    distance: str = 'cosine'
+    # Distance metric pre-resolved to its VEXFS_SEARCH_* constant at
+    # collection-create time so searches skip the string dispatch.
+    distance_type: int = VEXFS_SEARCH_COSINE
+    # Scale applied before rounding when element_type is VEXFS_VECTOR_INT8.
+    # 127.0 maps the [-1, 1] range of normalized embeddings onto the full
+    # int8 range.
+    quant_scale: float = 127.0
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """Single k-NN search hit."""
+    id: int
+    score: float
+    payload: Optional[Dict[str, Any]] = None
+
+
+class VexFSKernelClient:
+    """
+    Client for vector operations against a mounted VexFS v2 volume.
+
+    All vector data is marshalled to the kernel as IEEE 754 bit patterns via
+    the IOCTL commands defined in vexfs_uapi.h. Collections map onto vector
+    files below the mount point.
+    """
+
+    def __init__(self, mount_point: str):
+        """
+        Open a VexFS volume for vector operations.
+
+        Args:
+            mount_point: Path to a file on a mounted VexFS v2 volume
+
+        Raises:
+            VexFSError: If the path cannot be opened
+        """
+        try:
+            self.fd = os.open(mount_point, os.O_RDWR)
+        except OSError as e:
+            raise VexFSError(f"Failed to open VexFS volume at {mount_point}: {e}")
+        self.mount_point = mount_point
+        self._collections: Dict[str, VectorFileInfo] = {}
+        # Dense integer-ID side table: resolve() hands out indexes into
+        # _info so hot callers can skip the string-keyed dict lookup.
+        self._info: List[Optional[VectorFileInfo]] = []
+        self._ids: Dict[str, int] = {}
+        self._batch_search_supported: Optional[bool] = None
+        self._cext = _vexfs_client.Client(self.fd) if _vexfs_client else None
+        # Coalescing state for insert_points_coalesced().
+        self._insert_queue: Dict[Union[str, int], List[Dict[str, Any]]] = {}
+        self._insert_lock = threading.Lock()
+        self._flush_timer: Optional[threading.Timer] = None
+        self.coalesce_window = 0.0002  # seconds
+        # Reusable search result buffers: allocated once per thread and kept
+        # for the lifetime of the client instead of per call. Thread-local so
+        # async searches submitted through the executor cannot race on them.
+        self._buffers = threading.local()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Shared staging ring for zero-copy inserts; only available when the
+        # kernel exposes the mmap op on vector files.
+        self._ring: Optional[mmap.mmap] = None
+        self._ring_supported: Optional[bool] = None
+        try:
+            self._ring = mmap.mmap(self.fd, VEXFS_STAGING_RING_SIZE,
+                                   prot=mmap.PROT_READ | mmap.PROT_WRITE)
+        except (OSError, ValueError):
+            self._ring_supported = False
+
+    def close(self) -> None:
+        """Flush any queued inserts and close the file descriptor."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self) -> 'VexFSKernelClient':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # Collection management
+    # -------------------------------------------------------------------------
+
+    def create_collection(self, name: str, dimensions: int,
+                          distance: str = 'cosine',
+                          element_type: int = VEXFS_VECTOR_FLOAT32,
+                          quant_scale: float = 127.0) -> VectorFileInfo:
+        """
+        Create a collection by registering vector metadata with the kernel.
+
+        Args:
+            name: Collection name
+            dimensions: Vector dimensionality
+            distance: Default distance metric for searches
+            element_type: Stored element type; VEXFS_VECTOR_INT8 enables
+                symmetric int8 quantization of inserted vectors, cutting the
+                bytes crossing the user/kernel boundary by 4x
+            quant_scale: Float-to-int8 scale used when element_type is
+                VEXFS_VECTOR_INT8
+
+        Returns:
+            VectorFileInfo describing the new collection
+
+        Raises:
+            VexFSError: If the collection exists, the element type is
+                unsupported, or the IOCTL fails
+        """
+        if name in self._collections:
+            raise VexFSError(f"Collection already exists: {name}")
+        distance_type = get_vexfs_distance_type(distance)
+        if element_type not in (VEXFS_VECTOR_FLOAT32, VEXFS_VECTOR_INT8):
+            raise VexFSError(f"Unsupported element type: {element_type}")
+
+        info = VectorFileInfo(dimensions=dimensions, distance=distance,
+                              distance_type=distance_type,
+                              element_type=element_type,
+                              quant_scale=quant_scale)
+        meta = _META_STRUCT.pack(info.dimensions,
+                                 info.element_type,
+                                 info.vector_count,
+                                 info.storage_format,
+                                 info.data_offset,
+                                 info.index_offset,
+                                 info.compression_type,
+                                 info.alignment_bytes)
+        try:
+            fcntl.ioctl(self.fd, VEXFS_IOC_SET_VECTOR_META, meta)
+        except OSError as e:
+            raise VexFSError(f"Failed to create collection {name}: {e}")
+        self._collections[name] = info
+        self._ids[name] = len(self._info)
+        self._info.append(info)
+        return info
+
+    def delete_collection(self, name: str) -> None:
+        """
+        Drop a collection from the client's view.
+
+        Args:
+            name: Collection name
+
+        Raises:
+            VexFSError: If the collection does not exist
+        """
+        if self._collections.pop(name, None) is None:
+            raise VexFSError(f"Collection not found: {name}")
+        self._info[self._ids.pop(name)] = None
+
+    def resolve(self, name: str) -> int:
+        """
+        Resolve a collection name to its integer collection ID.
+
+        Hot callers resolve once and pass the returned ID to insert/search
+        methods, replacing a string hash + compare per call with a single
+        list index.
+
+        Args:
+            name: Collection name
+
+        Returns:
+            Integer collection ID accepted by all point operations
+
+        Raises:
+            VexFSError: If the collection does not exist
+        """
+        cid = self._ids.get(name)
+        if cid is None:
+            raise VexFSError(f"Collection not found: {name}")
+        return cid
+
+    def _get_info(self, collection: Union[str, int]) -> VectorFileInfo:
+        """Look up collection metadata by name or resolved integer ID."""
+        if type(collection) is int:
+            try:
+                info = self._info[collection]
+            except IndexError:
+                info = None
+        else:
+            # Single dict probe instead of membership test + second lookup.
+            info = self._collections.get(collection)
+        if info is None:
+            raise VexFSError(f"Collection not found: {collection}")
+        return info
+
+    # -------------------------------------------------------------------------
+    # Point operations
+    # -------------------------------------------------------------------------
+
+    def insert_points(self, collection: Union[str, int],
+                      points: List[Dict[str, Any]]) -> int:
+        """
+        Insert a batch of points via VEXFS_IOC_BATCH_INSERT.
+
+        Args:
+            collection: Target collection name
+            points: List of {"id": int|str, "vector": List[float]} dicts
+
+        Returns:
+            Number of points inserted
+
+        Raises:
+            VexFSError: If the collection is missing, a vector has the wrong
+                dimensionality, or the IOCTL fails
+        """
+        info = self._get_info(collection)
+        if not points:
+            return 0
+
+        # One numpy materialization replaces the per-point Python loop;
+        # ragged batches fail in np.asarray, dimensions in a single check.
+        try:
+            vectors = np.asarray([p['vector'] for p in points],
+                                 dtype=np.float32)
+        except (ValueError, TypeError) as e:
+            # Ragged or non-numeric batches fail inside np.asarray; surface
+            # numpy's diagnosis instead of re-walking the batch in Python.
+            raise VexFSError(f"Invalid vector batch: {e}")
+        if vectors.ndim != 2 or vectors.shape[1] != info.dimensions:
+            raise VexFSError(
+                f"Vector dimension mismatch: expected {info.dimensions}, "
+                f"got {vectors.shape[-1]}")
+
+        base = info.vector_count
+        raw_ids = [p.get('id') for p in points]
+        if any(type(pid) is str for pid in raw_ids):
+            # Slow path: string IDs need stable hashing.
+            ids_arr = np.fromiter(
+                (_hash_point_id(pid) if type(pid) is str
+                 else (base + i if pid is None else int(pid))
+                 for i, pid in enumerate(raw_ids)),
+                dtype=np.uint64, count=len(points))
+        else:
+            ids_arr = np.fromiter(
+                (base + i if pid is None else pid
+                 for i, pid in enumerate(raw_ids)),
+                dtype=np.uint64, count=len(points))
+
+        if info.element_type == VEXFS_VECTOR_INT8:
+            return self._insert_quantized(info, vectors, ids_arr)
+
+        if self._ring is not None and self._ring_supported is not False:
+            if self._insert_via_ring(info, vectors, ids_arr):
+                info.vector_count += len(points)
+                return len(points)
+
+        # float32 bits *are* the uint32 wire representation: reinterpret in
+        # place instead of round-tripping through a Python bit list.
+        vectors_arr = np.ascontiguousarray(
+            vectors, dtype='<f4').view(np.uint32).reshape(-1)
+
+        try:
+            if self._cext is not None:
+                self._cext.insert(vectors_arr, ids_arr,
+                                  len(points), info.dimensions,
+                                  VEXFS_INSERT_APPEND)
+            else:
+                request = struct.pack('<QIIQI4x',
+                                      vectors_arr.ctypes.data,
+                                      len(points),
+                                      info.dimensions,
+                                      ids_arr.ctypes.data,
+                                      VEXFS_INSERT_APPEND)
+                fcntl.ioctl(self.fd, VEXFS_IOC_BATCH_INSERT, request)
+        except OSError as e:
+            raise VexFSError(f"Batch insert failed: {e}")
+
+        info.vector_count += len(points)
+        return len(points)
+
+    def _get_result_buffers(self, limit: int) -> 'tuple[np.ndarray, np.ndarray]':
+        """Per-thread reusable result buffers, grown on demand."""
+        buffers = self._buffers
+        if getattr(buffers, 'capacity', 0) < limit:
+            buffers.capacity = max(limit, 1024)
+            buffers.bits = np.zeros(buffers.capacity, dtype=np.uint32)
+            buffers.ids = np.zeros(buffers.capacity, dtype=np.uint64)
+        return buffers.bits, buffers.ids
+
+    def _get_query_buffer(self, dimensions: int) -> np.ndarray:
+        """Per-thread reusable float32 query staging buffer."""
+        buffers = self._buffers
+        if getattr(buffers, 'query_dims', -1) != dimensions:
+            buffers.query_dims = dimensions
+            buffers.query = np.empty(dimensions, dtype=np.float32)
+        return buffers.query
+
+    def _insert_via_ring(self, info: VectorFileInfo,
+                         vectors: np.ndarray,
+                         ids: np.ndarray) -> bool:
+        """
+        Submit a batch insert through the mmap'd staging ring.
+
+        The vector bits and IDs are written straight into the shared mapping
+        (one memcpy) and VEXFS_IOC_BATCH_INSERT_RING carries only ring
+        offsets, so the kernel skips copy_from_user for the payload.
+
+        Returns:
+            True if the batch was submitted via the ring; False if the batch
+            does not fit or the kernel lacks ring support (caller falls back
+            to the pointer-based path).
+        """
+        bits = np.ascontiguousarray(vectors, dtype='<f4').view(np.uint32)
+        ids_arr = np.ascontiguousarray(ids, dtype=np.uint64)
+        # IDs start at the next 8-byte boundary after the vector payload.
+        ids_offset = (bits.nbytes + 7) & ~7
+        total = ids_offset + ids_arr.nbytes
+        if total > VEXFS_STAGING_RING_SIZE:
+            return False
+
+        ring = self._ring
+        ring.seek(0)
+        ring.write(bits.tobytes())
+        ring[ids_offset:ids_offset + ids_arr.nbytes] = ids_arr.tobytes()
+        request = struct.pack('<QIIQI4x',
+                              0,  # vector payload ring offset
+                              len(vectors),
+                              info.dimensions,
+                              ids_offset,
+                              VEXFS_INSERT_APPEND)
+        try:
+            fcntl.ioctl(self.fd, VEXFS_IOC_BATCH_INSERT_RING, request)
+        except OSError as e:
+            if e.errno == errno.ENOTTY:
+                self._ring_supported = False
+                return False
+            raise VexFSError(f"Ring insert failed: {e}")
+        self._ring_supported = True
+        return True
+
+    def _insert_quantized(self, info: VectorFileInfo,
+                          vectors: np.ndarray,
+                          ids: np.ndarray) -> int:
+        """
+        Batch insert with symmetric int8 quantization.
+
+        Skips the IEEE 754 bit conversion entirely: floats are scaled,
+        rounded and clipped to int8 in one vectorized pass, so a quarter of
+        the float32 byte volume crosses copy_from_user.
+        """
+        arr = np.ascontiguousarray(vectors, dtype=np.float32)
+        data = np.clip(np.rint(arr * info.quant_scale),
+                       -128, 127).astype(np.int8)
+        ids_arr = np.ascontiguousarray(ids, dtype=np.uint64)
+        request = struct.pack('<QIIQI4x',
+                              data.ctypes.data,
+                              len(vectors),
+                              info.dimensions,
+                              ids_arr.ctypes.data,
+                              VEXFS_INSERT_APPEND)
+        try:
+            fcntl.ioctl(self.fd, VEXFS_IOC_BATCH_INSERT, request)
+        except OSError as e:
+            raise VexFSError(f"Batch insert failed: {e}")
+        info.vector_count += len(vectors)
+        return len(vectors)
+
+    def insert_points_coalesced(self, collection: Union[str, int],
+                                points: List[Dict[str, Any]]) -> None:
+        """
+        Queue points for insertion and submit them in one batch IOCTL.
+
+        Small producers (1-10 points per call) pay one syscall each with
+        insert_points(); this path instead parks points for up to
+        ``coalesce_window`` seconds and flushes everything pending for the
+        collection in a single VEXFS_IOC_BATCH_INSERT. Call flush() to force
+        submission; close() flushes implicitly.
+
+        Args:
+            collection: Target collection name
+            points: List of {"id": int|str, "vector": List[float]} dicts
+
+        Raises:
+            VexFSError: If the collection does not exist
+        """
+        self._get_info(collection)
+        with self._insert_lock:
+            self._insert_queue.setdefault(collection, []).extend(points)
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.coalesce_window,
+                                                    self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """
+        Submit all queued inserts, one batch IOCTL per collection.
+
+        Raises:
+            VexFSError: If any underlying batch insert fails
+        """
+        with self._insert_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            pending, self._insert_queue = self._insert_queue, {}
+        for name, points in pending.items():
+            if points:
+                self.insert_points(name, points)
+
+    def search_vectors(self, collection: Union[str, int], query: Sequence[float],
+                       limit: int = 10,
+                       distance: Optional[str] = None) -> List[SearchResult]:
+        """
+        k-NN search via VEXFS_IOC_VECTOR_SEARCH.
+
+        Args:
+            collection: Collection to search
+            query: Query vector
+            limit: Maximum number of results (k)
+            distance: Distance metric override; defaults to the collection's
+
+        Returns:
+            List of SearchResult ordered by ascending distance
+
+        Raises:
+            VexFSError: If the collection is missing or the IOCTL fails
+        """
+        info = self._get_info(collection)
+        if len(query) != info.dimensions:
+            raise VexFSError(
+                f"Query dimension mismatch: expected {info.dimensions}, "
+                f"got {len(query)}")
+
+        search_type = (info.distance_type if distance is None
+                       else get_vexfs_distance_type(distance))
+
+        # Stage the query in a cached per-thread buffer; the uint32 view is
+        # a zero-copy reinterpret of the float32 bits.
+        query_buf = self._get_query_buffer(info.dimensions)
+        query_buf[:] = query
+        query_arr = query_buf.view(np.uint32)
+        result_bits, result_ids = self._get_result_buffers(limit)
+
+        try:
+            if self._cext is not None:
+                result_count = self._cext.search(
+                    query_arr,
+                    info.dimensions, limit, search_type,
+                    result_bits[:limit], result_ids[:limit])
+            else:
+                request = bytearray(struct.pack('<QIII4xQQI4x',
+                                                query_arr.ctypes.data,
+                                                info.dimensions,
+                                                limit,
+                                                search_type,
+                                                result_bits.ctypes.data,
+                                                result_ids.ctypes.data,
+                                                0))
+                fcntl.ioctl(self.fd, VEXFS_IOC_VECTOR_SEARCH, request)
+                result_count = struct.unpack_from('<I', request, 40)[0]
+        except OSError as e:
+            raise VexFSError(f"Vector search failed: {e}")
+        scores = result_bits.view(np.float32)
+        results = []
+        for i in range(min(result_count, limit)):
+            results.append(SearchResult(id=int(result_ids[i]),
+                                        score=float(scores[i])))
+        return results
+
+    def search_vectors_async(self, collection: Union[str, int],
+                             query: Sequence[float], limit: int = 10,
+                             distance: Optional[str] = None
+                             ) -> 'Future[List[SearchResult]]':
+        """
+        Submit a k-NN search without blocking the caller.
+
+        High-qps callers (e.g. the filter executor fanning out metadata
+        lookups) overlap many in-flight searches instead of serializing one
+        blocking ioctl per query. Submission currently rides a dedicated
+        thread pool; on kernels that grow IORING_OP_URING_CMD support for
+        VEXFS_IOC_VECTOR_SEARCH the same Future-based interface can be
+        backed by an io_uring submission ring without touching callers.
+
+        Args:
+            collection: Collection to search (name or resolved ID)
+            query: Query vector
+            limit: Maximum number of results (k)
+            distance: Distance metric override; defaults to the collection's
+
+        Returns:
+            Future resolving to the same result list search_vectors() returns
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=min(8, os.cpu_count() or 1),
+                thread_name_prefix='vexfs-search')
+        return self._executor.submit(self.search_vectors, collection, query,
+                                     limit, distance)
+
+    def search_vectors_batch(self, collection: Union[str, int],
+                             queries: Sequence[Sequence[float]],
+                             limit: int = 10,
+                             distance: Optional[str] = None
+                             ) -> List[List[SearchResult]]:
+        """
+        Multi-query k-NN search in a single IOCTL.
+
+        Stacks all queries into one contiguous IEEE 754 bit buffer and issues
+        one VEXFS_IOC_VECTOR_SEARCH_BATCH call, amortizing syscall overhead
+        across the batch. Falls back to per-query VEXFS_IOC_VECTOR_SEARCH
+        when the kernel does not support the batched command (ENOTTY).
+
+        Args:
+            collection: Collection to search
+            queries: Batch of query vectors
+            limit: Maximum number of results per query (k)
+            distance: Distance metric override; defaults to the collection's
+
+        Returns:
+            One result list per query, in input order
+
+        Raises:
+            VexFSError: If the collection is missing, a query has the wrong
+                dimensionality, or the IOCTL fails
+        """
+        info = self._get_info(collection)
+        if not queries:
+            return []
+
+        if self._batch_search_supported is False:
+            return [self.search_vectors(collection, q, limit, distance)
+                    for q in queries]
+
+        try:
+            query_arr = np.ascontiguousarray(queries, dtype='<f4')
+        except (ValueError, TypeError) as e:
+            raise VexFSError(f"Invalid query batch: {e}")
+        if query_arr.ndim != 2 or query_arr.shape[1] != info.dimensions:
+            raise VexFSError(
+                f"Query dimension mismatch: expected {info.dimensions}, "
+                f"got {query_arr.shape[-1]}")
+
+        n_queries = query_arr.shape[0]
+        search_type = (info.distance_type if distance is None
+                       else get_vexfs_distance_type(distance))
+
+        query_bits = query_arr.view(np.uint32)
+        result_bits = np.zeros(n_queries * limit, dtype=np.uint32)
+        result_ids = np.zeros(n_queries * limit, dtype=np.uint64)
+        out_counts = np.zeros(n_queries, dtype=np.uint32)
+
+        request = struct.pack('<QIIIIQQQ',
+                              query_bits.ctypes.data,
+                              n_queries,
+                              info.dimensions,
+                              limit,
+                              search_type,
+                              result_bits.ctypes.data,
+                              result_ids.ctypes.data,
+                              out_counts.ctypes.data)
+        try:
+            fcntl.ioctl(self.fd, VEXFS_IOC_VECTOR_SEARCH_BATCH, request)
+        except OSError as e:
+            if e.errno == errno.ENOTTY:
+                # Kernel predates the batched command; remember and loop.
+                self._batch_search_supported = False
+                return [self.search_vectors(collection, q, limit, distance)
+                        for q in queries]
+            raise VexFSError(f"Batch vector search failed: {e}")
+
+        self._batch_search_supported = True
+        scores = result_bits.view(np.float32)
+        results: List[List[SearchResult]] = []
+        for qi in range(n_queries):
+            count = min(int(out_counts[qi]), limit)
+            base = qi * limit
+            results.append([
+                SearchResult(id=int(result_ids[base + i]),
+                             score=float(scores[base + i]))
+                for i in range(count)
+            ])
+        return results
+
+    def get_vector_metadata(self, collection: Union[str, int],
+                            point_ids: List[int]) -> List[Dict[str, Any]]:
+        """
+        Fetch per-point metadata records for a set of point IDs.
+
+        Payload storage is not yet wired through the kernel interface, so the
+        records carry empty payloads; callers rely on the id echo for
+        existence checks.
+
+        Args:
+            collection: Collection name
+            point_ids: Point IDs to look up
+
+        Returns:
+            One metadata dict per requested point ID
+
+        Raises:
+            VexFSError: If the collection does not exist
+        """
+        self._get_info(collection)
+        return [{'id': pid, 'vector': None, 'payload': _EMPTY_PAYLOAD}
+                for pid in point_ids]
+
+    def scroll(self, collection: Union[str, int],
+               cursor: Optional[int] = None,
+               limit: int = 128) -> 'tuple[List[Dict[str, Any]], Optional[int]]':
+        """
+        Fetch one page of point metadata in ID order.
+
+        Pagination is cursor-based so callers do work proportional to
+        the records returned, not to the ID space walked; the cursor is
+        an opaque continuation token (currently the next unread ID).
+        Payload storage is not yet wired through the kernel interface,
+        so records carry empty payloads like get_vector_metadata.
+
+        Args:
+            collection: Collection name
+            cursor: Token from the previous page, or None for the start
+            limit: Maximum number of records per page
+
+        Returns:
+            (records, next_cursor); next_cursor is None on the last page
+
+        Raises:
+            VexFSError: If the collection does not exist
+        """
+        info = self._get_info(collection)
+        start = 0 if cursor is None else int(cursor)
+        stop = min(start + max(limit, 0), info.vector_count)
+        records = [{'id': pid, 'vector': None, 'payload': _EMPTY_PAYLOAD}
+                   for pid in range(start, stop)]
+        return records, (stop if stop < info.vector_count else None)
@@ -0,0 +1,1190 @@
+"""
+Metadata filter execution.
+
+FilterExecutor evaluates parsed filter trees (see filter_parser) against
+per-point metadata and returns the matching point IDs as a PointIdSet.
+
+Payload storage is not wired through the kernel interface yet, so point
+metadata is simulated deterministically from the point ID; the evaluation
+machinery is real and switches to kernel-backed metadata transparently once
+VEXFS_IOC_GET_VECTOR_META grows payload support.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import math
+from collections import OrderedDict
+
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Union
+
+from ._filter_kernels import range_mask
+from ._geo_kernels import _use_equirect, haversine_mask
+from .filter_program import get_program
+from .filter_parser import _canonical_key, _signature_bit
+from .kernel_client import VexFSError, VexFSKernelClient
+from .pointset import LazyStringRange, PointIdSet
+
+logger = logging.getLogger(__name__)
+
+_RESULT_CACHE_SIZE = 1024
+
+_FUSED_CACHE_SIZE = 256
+
+_METADATA_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _estimate_nbytes(value: Any) -> int:
+    """Rough deep byte footprint of a cached metadata value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return 64 + sum(_estimate_nbytes(key) + _estimate_nbytes(item)
+                        for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return 56 + sum(_estimate_nbytes(item) for item in value)
+    if isinstance(value, str):
+        return 49 + len(value)
+    return 28
+
+
+class _ByteBudgetCache:
+    """
+    LRU cache bounded by estimated byte footprint instead of entry count.
+
+    Metadata entries vary widely in size, so an entry-count bound either
+    wastes the budget on small payloads or blows far past it on large
+    ones. A running bytes_used counter with oldest-first eviction keeps
+    the cache at a fixed memory ceiling on long-running servers.
+    """
+
+    __slots__ = ('_entries', '_sizes', 'max_bytes', 'bytes_used')
+
+    def __init__(self, max_bytes: int):
+        self._entries: 'OrderedDict[Any, Any]' = OrderedDict()
+        self._sizes: Dict[Any, int] = {}
+        self.max_bytes = max_bytes
+        self.bytes_used = 0
+
+    def get(self, key: Any) -> Any:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Any, value: Any) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return
+        size = 64 + _estimate_nbytes(key) + _estimate_nbytes(value)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.bytes_used += size
+        while self.bytes_used > self.max_bytes and len(self._entries) > 1:
+            evicted, _ = self._entries.popitem(last=False)
+            self.bytes_used -= self._sizes.pop(evicted)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self.bytes_used = 0
+
+
+class _NotColumnar(Exception):
+    """Raised while lowering a filter node that has no columnar form."""
+
+
+@functools.lru_cache(maxsize=1024)
+def _frozen_ids(ids: 'tuple[str, ...]') -> frozenset:
+    """
+    Shared membership set for a has_id id tuple.
+
+    Parsed nodes must keep ids as a JSON-serializable list (cache keys are
+    json.dumps of the tree), so the O(1)-lookup form is derived here and
+    memoized instead of living inside the node.
+    """
+    return frozenset(ids)
+
+
+def _quantize_bound(value: float, scale: int, bound: str) -> int:
+    """
+    Integer form of a range bound against a scale-quantized column.
+
+    Stored values sit exactly on the 1/scale grid, so each comparison has
+    an equivalent integer bound: exclusive-lower and inclusive-upper
+    bounds floor, the other two ceil. The compare then stays in the
+    column's integer dtype instead of promoting it to float64.
+    """
+    scaled = value * scale
+    if bound in ('gt', 'lte'):
+        return math.floor(scaled)
+    return math.ceil(scaled)
+
+
+def _finalize_matches(matched: List[str]) -> PointIdSet:
+    """
+    One-shot conversion of a streamed match list to a PointIdSet.
+
+    All-numeric matches scatter into the bitmap in a single pass; anything
+    else becomes the fallback string set. Scan loops append to a plain
+    list and call this once instead of paying a set insert per match.
+    """
+    if matched and all(pid.isdigit() for pid in matched):
+        indices = np.fromiter(map(int, matched), dtype=np.uint64,
+                              count=len(matched))
+        return PointIdSet.from_indices(indices, int(indices.max()) + 1)
+    return PointIdSet.from_ids(matched)
+
+_CATEGORIES = ('electronics', 'books', 'clothing', 'food', 'sports')
+
+_CATEGORY_ARR = np.array(_CATEGORIES, dtype=object)
+
+_EARTH_RADIUS_M = 6371000.0
+
+_U64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _splitmix64(value: int) -> int:
+    """
+    64-bit splitmix fingerprint of an integer point ID.
+
+    Chosen over md5 because the same mixing runs vectorized over a whole
+    uint64 ID column (_splitmix64_column); the scalar form here must stay
+    bit-identical so the per-point and columnar paths agree.
+    """
+    z = (value + 0x9E3779B97F4A7C15) & _U64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _U64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _U64
+    return z ^ (z >> 31)
+
+
+def _splitmix64_column(count: int) -> np.ndarray:
+    """Seeds for point IDs 0..count-1 as one vectorized uint64 pass."""
+    z = np.arange(count, dtype=np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _simulate_field_column(seeds: np.ndarray, field: str
+                           ) -> Optional[np.ndarray]:
+    """
+    One simulated metadata field as a whole structure-of-arrays column.
+
+    Mirrors _simulate_point_metadata field by field but computes every
+    point's value in a few numpy passes over the seed column instead of
+    N Python hash-and-dict constructions. Location comes back as an
+    (N, 2) lat/lon float64 array, tags as an (N, 2) object array of
+    elements; unknown fields return None.
+    """
+    if field == 'category':
+        return np.take(_CATEGORY_ARR, (seeds % np.uint64(5)).astype(np.intp))
+    if field == 'price':
+        return (seeds % np.uint64(100000)).astype(np.float64) / 100.0
+    if field == 'rating':
+        return ((seeds >> np.uint64(8)) % np.uint64(50)).astype(
+            np.float64) / 10.0
+    if field == 'stock':
+        return ((seeds >> np.uint64(4)) % np.uint64(1000)).astype(np.int64)
+    if field == 'location':
+        lats = -90.0 + (seeds % np.uint64(18000)).astype(np.float64) / 100.0
+        lons = -180.0 + ((seeds >> np.uint64(4)) %
+                         np.uint64(36000)).astype(np.float64) / 100.0
+        return np.stack([lats, lons], axis=1)
+    if field == 'tags':
+        return np.stack(
+            [np.take(_CATEGORY_ARR,
+                     ((seeds >> np.uint64(shift)) %
+                      np.uint64(5)).astype(np.intp))
+             for shift in (3, 7)], axis=1)
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _geo_constants(lat: float, lon: float,
+                   radius: float) -> 'tuple[float, float, float, float]':
+    """
+    Center-dependent geo terms, cached per (lat, lon, radius).
+
+    A radius filter evaluates the same center against every point, so the
+    center radians, its cosine, the a-term threshold and the
+    equirectangular squared threshold are computed once per distinct
+    query rather than once per point.
+    """
+    clat_r = math.radians(lat)
+    angular = radius / _EARTH_RADIUS_M
+    clamped = min(angular, math.pi)
+    return (clat_r, math.radians(lon), math.cos(clat_r),
+            math.sin(clamped / 2.0) ** 2, angular * angular,
+            _use_equirect(lat, radius))
+
+
+class FilterExecutor:
+    """Evaluates parsed filter trees against collection point metadata."""
+
+    def __init__(self, vexfs_client: VexFSKernelClient,
+                 metadata_cache_bytes: int = _METADATA_CACHE_BYTES):
+        self.client = vexfs_client
+        self._metadata_cache = _ByteBudgetCache(metadata_cache_bytes)
+        self._result_cache: 'OrderedDict[Any, PointIdSet]' = OrderedDict()
+        self._column_cache: Dict[Any, Optional[np.ndarray]] = {}
+        self._fused_cache: 'OrderedDict[Any, Optional[tuple]]' = OrderedDict()
+        self._inverted_cache: Dict[Any, Dict[Any, np.ndarray]] = {}
+
+    # -------------------------------------------------------------------------
+    # Public interface
+    # -------------------------------------------------------------------------
+
+    def execute_filter(self, collection: str, parsed: Dict[str, Any],
+                       point_ids: Optional[List[str]] = None,
+                       predicate: Optional[Callable[[Dict[str, Any]],
+                                                    bool]] = None
+                       ) -> PointIdSet:
+        """
+        Evaluate a parsed filter over a collection.
+
+        Args:
+            collection: Collection name
+            parsed: Parsed filter tree from FilterParser.parse_filter
+            point_ids: Optional candidate subset; defaults to all points
+            predicate: Optional compiled row predicate semantically equal to
+                ``parsed``; used in place of the generic interpreter
+
+        Returns:
+            PointIdSet of matching point IDs
+        """
+        # Results are cached only for the full-collection case: its key is
+        # O(1), whereas keying on the candidate list means copying and
+        # hashing every element per call (and different lists can collide).
+        # Subset queries reuse the full result by intersection instead.
+        version = self.client._get_info(collection).vector_count
+        filter_key = _canonical_key(parsed)
+        cache_key = (collection, version, filter_key)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            if point_ids is not None:
+                return cached & PointIdSet.from_ids(point_ids)
+            return cached.copy()
+
+        if point_ids is None:
+            result = self._execute_dense(collection, parsed, predicate)
+            if result is not None:
+                self._store_result(cache_key, result)
+                return result
+            candidates = self._get_all_point_ids(collection)
+        else:
+            if parsed['type'] not in ('is_empty', 'has_id'):
+                # A dense fast path makes the full result cheap to build
+                # and cache; answer the subset by intersection.
+                full = self._execute_dense(collection, parsed, predicate)
+                if full is not None:
+                    self._store_result(cache_key, full)
+                    return full & PointIdSet.from_ids(point_ids)
+            candidates = [str(pid) for pid in point_ids]
+
+        if parsed['type'] == 'has_id':
+            wanted = _frozen_ids(tuple(parsed['ids']))
+            matched = [pid for pid in candidates if pid in wanted]
+        elif predicate is not None:
+            matched = [pid for pid in candidates
+                       if predicate(self._get_point_metadata(collection,
+                                                             pid))]
+        else:
+            matched = self._scan_candidates(collection, parsed, candidates)
+
+        # Stay on the bitmap representation whenever the candidate IDs are
+        # numeric; strings only appear at the public API boundary.
+        result = _finalize_matches(matched)
+        if point_ids is None:
+            self._store_result(cache_key, result)
+        return result
+
+    def _scan_candidates(self, collection: str, parsed: Dict[str, Any],
+                         candidates: Sequence[str]) -> List[str]:
+        """
+        Interpreter scan over an explicit candidate list.
+
+        Single-field leaf nodes read the field's cached value column and
+        test one array element per candidate, hoisting both the metadata
+        dict build and the per-leaf keyed lookup out of the loop. Boolean
+        trees and fields without a column fall back to per-point metadata.
+        """
+        if parsed['type'] != 'boolean':
+            values = self.get_field_values(collection, parsed['key'])
+            if values is not None:
+                count = values.shape[0]
+                if all(pid.isdigit() and int(pid) < count
+                       for pid in candidates):
+                    matches_value = self._matches_value
+                    return [pid for pid in candidates
+                            if matches_value(parsed, values[int(pid)])]
+            elif parsed['type'] == 'match':
+                # List field: one AND against the packed signature column
+                # rejects most candidates before the exact list check.
+                signatures = self.get_signature_column(collection,
+                                                       parsed['key'])
+                if signatures is not None:
+                    count = signatures.shape[0]
+                    if all(pid.isdigit() and int(pid) < count
+                           for pid in candidates):
+                        bit = parsed.get('bloom')
+                        if bit is not None:
+                            candidates = [pid for pid in candidates
+                                          if int(signatures[int(pid)]) & bit]
+        return [pid for pid in candidates
+                if self._matches(parsed,
+                                 self._get_point_metadata(collection, pid),
+                                 pid)]
+
+    def estimate_cardinality(self, collection: str,
+                             parsed: Dict[str, Any]) -> int:
+        """
+        Estimated result size for a parsed filter, for AND ordering.
+
+        Uses whatever statistics are already materialized — inverted-index
+        posting sizes, sorted-column probes — and falls back to coarse
+        per-type fractions of the collection. Never builds an index just
+        to produce an estimate.
+        """
+        info = self.client._get_info(collection)
+        count = info.vector_count
+        node_type = parsed['type']
+        if node_type == 'always_false':
+            return 0
+        if node_type == 'always_true':
+            return count
+        if node_type == 'has_id':
+            return len(parsed['ids'])
+        if node_type == 'boolean':
+            if parsed['must']:
+                return min(self.estimate_cardinality(collection, child)
+                           for child in parsed['must'])
+            return count
+        if node_type == 'match':
+            index = self._inverted_cache.get(
+                (collection, parsed['key'], count))
+            if index is not None:
+                try:
+                    mask = index.get(parsed['value'])
+                except TypeError:
+                    mask = None
+                return int(np.count_nonzero(mask)) if mask is not None else 0
+            return count // 10
+        if node_type == 'range':
+            sorted_column = self._column_cache.get(
+                (collection, parsed['key'], count, 'sorted'))
+            if sorted_column is not None:
+                sorted_values = sorted_column[0]
+                bounds = parsed['bounds']
+                lo = int(np.searchsorted(
+                    sorted_values, bounds.get('gte', bounds.get('gt', -np.inf)),
+                    side='left'))
+                hi = int(np.searchsorted(
+                    sorted_values, bounds.get('lte', bounds.get('lt', np.inf)),
+                    side='right'))
+                return max(hi - lo, 0)
+            return count // 4
+        if node_type in ('geo_radius', 'geo_bounding_box'):
+            return count // 2
+        return count
+
+    def execute_boolean_fused(self, collection: str,
+                              parsed: Dict[str, Any]) -> Optional[PointIdSet]:
+        """
+        Evaluate a boolean tree as one fused columnar mask expression.
+
+        The tree is lowered to a single numpy expression over the cached
+        columns (leaf masks for geo and is_null are bound as variables),
+        compiled once and cached per collection version and filter, so a
+        multi-clause filter runs as one C-level compare/AND/OR chain with
+        no per-clause PointIdSet temporaries. Returns None when any leaf
+        has no columnar form; the caller falls back to clause folding.
+        """
+        version = self.client._get_info(collection).vector_count
+        cache_key = (collection, version, _canonical_key(parsed))
+        if cache_key in self._fused_cache:
+            entry = self._fused_cache[cache_key]
+            self._fused_cache.move_to_end(cache_key)
+        else:
+            try:
+                bindings: Dict[str, Any] = {}
+                expr = self._lower_mask(collection, parsed, bindings,
+                                        counter=iter(range(1 << 20)))
+                entry = (compile(expr, '<fused-filter>', 'eval'), bindings)
+            except _NotColumnar:
+                entry = None
+            if len(self._fused_cache) >= _FUSED_CACHE_SIZE:
+                self._fused_cache.popitem(last=False)
+            self._fused_cache[cache_key] = entry
+        if entry is None:
+            return None
+        code, bindings = entry
+        return PointIdSet(mask=eval(code, {'__builtins__': {}}, bindings))
+
+    def _lower_mask(self, collection: str, parsed: Dict[str, Any],
+                    bindings: Dict[str, Any], counter) -> str:
+        """Lower one node to a mask expression, binding columns/leaf masks."""
+        node_type = parsed['type']
+        if node_type == 'boolean':
+            if parsed.get('min_should_match', 1) > 1:
+                # Needs the tally accumulator; handled by the plan walk.
+                raise _NotColumnar('min_should_match')
+            parts = [self._lower_mask(collection, child, bindings, counter)
+                     for child in parsed['must']]
+            parts += [f'~({self._lower_mask(collection, child, bindings, counter)})'
+                      for child in parsed['must_not']]
+            if parsed['should']:
+                parts.append('(' + ' | '.join(
+                    self._lower_mask(collection, child, bindings, counter)
+                    for child in parsed['should']) + ')')
+            if not parts:
+                name = f'm{next(counter)}'
+                count = self.client._get_info(collection).vector_count
+                bindings[name] = np.ones(count, dtype=bool)
+                return name
+            return '(' + ' & '.join(parts) + ')'
+        if node_type == 'range':
+            ops = {'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+            quantized = self.get_quantized_column(collection, parsed['key'])
+            if quantized is not None:
+                column, scale = quantized
+                name = f'c{next(counter)}'
+                bindings[name] = column
+                return '(' + ' & '.join(
+                    f'({name} {ops[bound]} '
+                    f'{_quantize_bound(value, scale, bound)!r})'
+                    for bound, value in parsed['bounds'].items()) + ')'
+            column = self.get_field_column(collection, parsed['key'])
+            if column is None:
+                raise _NotColumnar(parsed['key'])
+            name = f'c{next(counter)}'
+            bindings[name] = column
+            return '(' + ' & '.join(
+                f'({name} {ops[bound]} {value!r})'
+                for bound, value in parsed['bounds'].items()) + ')'
+        if node_type == 'match':
+            values = self.get_field_values(collection, parsed['key'])
+            if values is None:
+                raise _NotColumnar(parsed['key'])
+            col = f'c{next(counter)}'
+            val = f'v{next(counter)}'
+            bindings[col] = values
+            bindings[val] = parsed['value']
+            return f'({col} == {val})'
+        if node_type == 'always_false':
+            name = f'm{next(counter)}'
+            count = self.client._get_info(collection).vector_count
+            bindings[name] = np.zeros(count, dtype=bool)
+            return name
+        if node_type == 'always_true':
+            name = f'm{next(counter)}'
+            count = self.client._get_info(collection).vector_count
+            bindings[name] = np.ones(count, dtype=bool)
+            return name
+        if node_type in ('is_null', 'geo_radius', 'geo_bounding_box'):
+            leaf = self._execute_dense(collection, parsed)
+            if leaf is None or leaf._mask is None:
+                raise _NotColumnar(node_type)
+            name = f'm{next(counter)}'
+            bindings[name] = leaf._mask
+            return name
+        raise _NotColumnar(node_type)
+
+    def _store_result(self, cache_key: Any, result: PointIdSet) -> None:
+        """Insert into the LRU-bounded result cache."""
+        if len(self._result_cache) >= _RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        self._result_cache[cache_key] = result.copy()
+
+    def execute_filters_batch(self, collection: str,
+                              parsed_filters: List[Dict[str, Any]],
+                              point_ids: Optional[List[str]] = None
+                              ) -> List[PointIdSet]:
+        """
+        Evaluate several parsed filters over one candidate scan.
+
+        Per-point metadata is fetched once and every generic filter is
+        evaluated against it, instead of paying one full candidate walk per
+        filter. Filters with dense fast paths (range columns, has_id) are
+        dispatched individually since they never touch per-point metadata.
+        Results are positionally aligned with ``parsed_filters``.
+        """
+        results: List[Optional[PointIdSet]] = [None] * len(parsed_filters)
+        pending: List[int] = []
+        for index, parsed in enumerate(parsed_filters):
+            if point_ids is None and parsed['type'] in ('range', 'has_id'):
+                results[index] = self.execute_filter(collection, parsed)
+            else:
+                pending.append(index)
+        if not pending:
+            return results
+
+        if point_ids is not None:
+            candidates = [str(pid) for pid in point_ids]
+        else:
+            candidates = self._get_all_point_ids(collection)
+        wanted_sets = {
+            index: _frozen_ids(tuple(parsed_filters[index]['ids']))
+            for index in pending if parsed_filters[index]['type'] == 'has_id'
+        }
+        prefilters: Dict[int, 'tuple[int, np.ndarray]'] = {}
+        for index in pending:
+            parsed = parsed_filters[index]
+            if parsed['type'] != 'match':
+                continue
+            bit = parsed.get('bloom')
+            if bit is None:
+                continue
+            signatures = self.get_signature_column(collection, parsed['key'])
+            if signatures is None:
+                continue
+            prefilters[index] = (bit, signatures)
+        # One scan yields each candidate at most once per filter, so matches
+        # stream into plain lists (amortized appends, no per-element hash)
+        # and convert to sets once at the end. Each filter is lowered to a
+        # flat program once, so the inner loop dispatches on int opcodes
+        # instead of re-walking the parsed dict tree per point.
+        programs = {index: get_program(parsed_filters[index])
+                    for index in pending
+                    if parsed_filters[index]['type'] != 'has_id'}
+        match_lists: Dict[int, List[str]] = {index: [] for index in pending}
+        for pid in candidates:
+            metadata = None
+            for index in pending:
+                if index not in programs:
+                    if pid in wanted_sets[index]:
+                        match_lists[index].append(pid)
+                    continue
+                prefilter = prefilters.get(index)
+                if prefilter is not None and pid.isdigit():
+                    bit, signatures = prefilter
+                    point_index = int(pid)
+                    if (point_index < signatures.shape[0] and
+                            not int(signatures[point_index]) & bit):
+                        continue
+                if metadata is None:
+                    metadata = self._get_point_metadata(collection, pid)
+                if programs[index].matches(metadata, pid):
+                    match_lists[index].append(pid)
+        for index in pending:
+            results[index] = _finalize_matches(match_lists[index])
+        return results
+
+    def clear_cache(self) -> None:
+        """Drop cached metadata and filter results."""
+        self._metadata_cache.clear()
+        self._result_cache.clear()
+        self._column_cache.clear()
+        self._fused_cache.clear()
+        self._inverted_cache.clear()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Entry counts and byte budget usage of the executor caches."""
+        return {
+            'metadata_entries': len(self._metadata_cache),
+            'metadata_cache_bytes': self._metadata_cache.bytes_used,
+            'metadata_cache_max_bytes': self._metadata_cache.max_bytes,
+            'result_entries': len(self._result_cache),
+            'column_entries': len(self._column_cache),
+            'fused_entries': len(self._fused_cache),
+            'inverted_entries': len(self._inverted_cache),
+        }
+
+    # -------------------------------------------------------------------------
+    # Vectorized fast paths
+    # -------------------------------------------------------------------------
+
+    def _execute_dense(self, collection: str, parsed: Dict[str, Any],
+                       predicate: Optional[Callable[[Dict[str, Any]],
+                                                    bool]] = None
+                       ) -> Optional[PointIdSet]:
+        """
+        Full-collection evaluation that stays on integer point indices.
+
+        Collection point IDs are dense 0..N-1, so accumulating matches as a
+        uint64 index array and scattering into the bitmap once avoids the
+        str round-trip (hash + ~50 bytes per ID) of the generic path.
+        Returns None for node types that need the generic evaluator.
+        """
+        info = self.client._get_info(collection)
+        count = info.vector_count
+
+        if parsed['type'] == 'always_false':
+            return PointIdSet.empty(count)
+        if parsed['type'] == 'always_true':
+            return PointIdSet.from_range(count)
+
+        if parsed['type'] == 'range':
+            sorted_column = self.get_sorted_column(collection, parsed['key'])
+            if sorted_column is None:
+                return None
+            sorted_values, sorted_indices = sorted_column
+            lo, hi = 0, sorted_values.shape[0]
+            bounds = parsed['bounds']
+            if 'gte' in bounds:
+                lo = max(lo, int(np.searchsorted(sorted_values,
+                                                 bounds['gte'], side='left')))
+            if 'gt' in bounds:
+                lo = max(lo, int(np.searchsorted(sorted_values,
+                                                 bounds['gt'], side='right')))
+            if 'lte' in bounds:
+                hi = min(hi, int(np.searchsorted(sorted_values,
+                                                 bounds['lte'],
+                                                 side='right')))
+            if 'lt' in bounds:
+                hi = min(hi, int(np.searchsorted(sorted_values,
+                                                 bounds['lt'], side='left')))
+            if lo >= hi:
+                return PointIdSet.empty(count)
+            return PointIdSet.from_indices(sorted_indices[lo:hi], count)
+
+        if parsed['type'] == 'match':
+            index = self.get_inverted_index(collection, parsed['key'])
+            value = parsed['value']
+            try:
+                mask = index.get(value)
+            except TypeError:
+                return None  # unhashable match value; generic path
+            if mask is None:
+                return PointIdSet.empty(count)
+            return PointIdSet(mask=mask.copy())
+
+        if parsed['type'] == 'is_null':
+            index = self.get_inverted_index(collection, parsed['key'])
+            mask = index.get(None)
+            if mask is None:
+                return PointIdSet.empty(count)
+            return PointIdSet(mask=mask.copy())
+
+        if parsed['type'] == 'geo_radius':
+            columns = self.get_geo_columns(collection, parsed['key'])
+            if columns is not None:
+                lats, lons = columns
+                mask = haversine_mask(lats, lons, parsed['lat'],
+                                      parsed['lon'], parsed['radius'])
+                mask &= ~np.isnan(lats)
+                return PointIdSet(mask=mask)
+            return None
+
+        if parsed['type'] == 'geo_bounding_box':
+            columns = self.get_geo_columns(collection, parsed['key'])
+            if columns is not None:
+                lats, lons = columns
+                mask = (lats >= parsed['bottom']) & (lats <= parsed['top'])
+                if parsed['left'] <= parsed['right']:
+                    mask &= (lons >= parsed['left']) & \
+                        (lons <= parsed['right'])
+                else:
+                    # Box crosses the antimeridian.
+                    mask &= (lons >= parsed['left']) | \
+                        (lons <= parsed['right'])
+                return PointIdSet(mask=mask)
+            return None
+
+        if parsed['type'] == 'has_id':
+            wanted = np.fromiter(
+                (int(pid) for pid in parsed['ids']
+                 if str(pid).isdigit() and int(pid) < count),
+                dtype=np.uint64)
+            return PointIdSet.from_indices(wanted, count)
+
+        if predicate is None and parsed['type'] != 'boolean':
+            values = self.get_field_values(collection, parsed['key'])
+            if values is not None:
+                matches_value = self._matches_value
+                matches = np.fromiter(
+                    (index for index in range(count)
+                     if matches_value(parsed, values[index])),
+                    dtype=np.uint64)
+                return PointIdSet.from_indices(matches, count)
+        if predicate is not None:
+            matches = np.fromiter(
+                (index for index in range(count)
+                 if predicate(self._get_point_metadata(collection,
+                                                       str(index)))),
+                dtype=np.uint64)
+            return PointIdSet.from_indices(matches, count)
+        matches = np.fromiter(
+            (index for index in range(count)
+             if self._matches(parsed,
+                              self._get_point_metadata(collection,
+                                                       str(index)),
+                              str(index))),
+            dtype=np.uint64)
+        return PointIdSet.from_indices(matches, count)
+
+    def get_inverted_index(self, collection: str,
+                           field: str) -> Dict[Any, np.ndarray]:
+        """
+        Inverted index for a field: value -> bitmap of points holding it.
+
+        Built in one metadata pass and cached per collection version; a
+        match filter then costs a single dict lookup plus a bitmap copy
+        instead of an O(N) scan. List-valued fields index each element,
+        None indexes missing/null values (serving is_null directly).
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count)
+        index = self._inverted_cache.get(cache_key)
+        if index is not None:
+            return index
+        simulated = self._simulated_column(info.vector_count, field)
+        if simulated is not None:
+            index = {}
+            if simulated.ndim == 1:
+                for value in np.unique(simulated):
+                    index[value] = simulated == value
+            elif simulated.dtype == object:
+                # List-valued fields: a point matches if any element does.
+                for value in np.unique(simulated):
+                    index[value] = (simulated == value).any(axis=1)
+            self._inverted_cache[cache_key] = index
+            return index
+        postings: Dict[Any, List[int]] = {}
+        for point_index in range(info.vector_count):
+            value = self._get_point_metadata(collection,
+                                             str(point_index)).get(field)
+            if isinstance(value, list):
+                for element in value:
+                    postings.setdefault(element, []).append(point_index)
+            elif isinstance(value, dict):
+                continue  # geo points etc. have dedicated columns
+            else:
+                postings.setdefault(value, []).append(point_index)
+        index = {}
+        for value, indices in postings.items():
+            mask = np.zeros(info.vector_count, dtype=bool)
+            mask[indices] = True
+            index[value] = mask
+        self._inverted_cache[cache_key] = index
+        return index
+
+    def get_field_values(self, collection: str,
+                         field: str) -> Optional[np.ndarray]:
+        """
+        Metadata field as an object-dtype column over point IDs 0..N-1.
+
+        The column is the structure-of-arrays view of one field across the
+        whole collection, so scalar predicates evaluate as a single
+        elementwise numpy comparison. List-valued fields (tags) have no
+        useful columnar comparison and are remembered as None.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count, object)
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        simulated = self._simulated_column(info.vector_count, field)
+        if simulated is not None:
+            if simulated.ndim != 1:
+                values = None  # list/dict valued; no scalar column
+            elif simulated.dtype == object:
+                values = simulated
+            else:
+                values = simulated.astype(object)
+            self._column_cache[cache_key] = values
+            return values
+        values = np.empty(info.vector_count, dtype=object)
+        for index in range(info.vector_count):
+            value = self._get_point_metadata(collection, str(index)).get(field)
+            if isinstance(value, (list, dict)):
+                self._column_cache[cache_key] = None
+                return None
+            values[index] = value
+        self._column_cache[cache_key] = values
+        return values
+
+    def get_geo_columns(self, collection: str, field: str
+                        ) -> 'Optional[tuple[np.ndarray, np.ndarray]]':
+        """
+        Geo point field as contiguous float64 lat/lon columns.
+
+        Missing or malformed locations become NaN and are masked out by the
+        caller; fields that are not geo points at all are remembered as
+        None so the generic path is taken without re-probing.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count, 'geo')
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        simulated = self._simulated_column(info.vector_count, field)
+        if simulated is not None:
+            if simulated.ndim == 2 and simulated.dtype == np.float64:
+                columns = (np.ascontiguousarray(simulated[:, 0]),
+                           np.ascontiguousarray(simulated[:, 1]))
+            else:
+                columns = None
+            self._column_cache[cache_key] = columns
+            return columns
+        lats = np.full(info.vector_count, np.nan, dtype=np.float64)
+        lons = np.full(info.vector_count, np.nan, dtype=np.float64)
+        seen_point = False
+        for index in range(info.vector_count):
+            value = self._get_point_metadata(collection, str(index)).get(field)
+            if isinstance(value, dict):
+                lat = value.get('lat')
+                lon = value.get('lon')
+                if lat is not None and lon is not None:
+                    lats[index] = lat
+                    lons[index] = lon
+                    seen_point = True
+            elif value is not None:
+                self._column_cache[cache_key] = None
+                return None
+        columns = (lats, lons) if seen_point else None
+        self._column_cache[cache_key] = columns
+        return columns
+
+    def get_quantized_column(self, collection: str, field: str
+                             ) -> 'Optional[tuple[np.ndarray, int]]':
+        """
+        Numeric field as an int32 column plus its fixed-point scale.
+
+        Integer-valued fields store as int32 directly (scale 1); values
+        with at most two decimals store x100 (scale 100, covering prices
+        and ratings). Range compares over int32 scan half the bytes of
+        float64 and fit twice as many lanes per SIMD register. Fields
+        that do not quantize losslessly are remembered as None.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count, 'quant')
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        quantized = None
+        column = self.get_field_column(collection, field)
+        if column is not None:
+            for scale in (1, 100):
+                scaled = np.round(column * scale)
+                if (np.all(np.abs(scaled) < 2 ** 31) and
+                        np.array_equal(scaled / scale, column)):
+                    quantized = (scaled.astype(np.int32), scale)
+                    break
+        self._column_cache[cache_key] = quantized
+        return quantized
+
+    def get_signature_column(self, collection: str,
+                             field: str) -> Optional[np.ndarray]:
+        """
+        Per-point uint64 bag-of-elements signatures for a list field.
+
+        Every element of a point's list sets one of 64 hash-derived bits,
+        so a match query rejects non-candidates with a single bitwise AND
+        over the packed column before the exact membership check runs. A
+        hash collision only admits a false candidate — never a wrong
+        result — because survivors are verified against the real list.
+        Fields that are not uniformly list-valued are remembered as None.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count, 'sig')
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        simulated = self._simulated_column(info.vector_count, field)
+        if simulated is not None:
+            if simulated.ndim == 2 and simulated.dtype == object:
+                signatures = np.zeros(info.vector_count, dtype=np.uint64)
+                for value in np.unique(simulated):
+                    signatures[(simulated == value).any(axis=1)] |= \
+                        np.uint64(_signature_bit(value))
+            else:
+                signatures = None
+            self._column_cache[cache_key] = signatures
+            return signatures
+        signatures = np.zeros(info.vector_count, dtype=np.uint64)
+        for index in range(info.vector_count):
+            value = self._get_point_metadata(collection,
+                                             str(index)).get(field)
+            if not isinstance(value, list):
+                self._column_cache[cache_key] = None
+                return None
+            try:
+                for element in value:
+                    signatures[index] |= np.uint64(_signature_bit(element))
+            except TypeError:  # unhashable element
+                self._column_cache[cache_key] = None
+                return None
+        self._column_cache[cache_key] = signatures
+        return signatures
+
+    def get_sorted_column(self, collection: str, field: str
+                          ) -> 'Optional[tuple[np.ndarray, np.ndarray]]':
+        """
+        Numeric field as (sorted values, matching point indices).
+
+        Two np.searchsorted probes then answer any range predicate with a
+        contiguous index slice — O(log N) instead of an O(N) mask pass.
+        Shares the column cache and its versioning.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count, 'sorted')
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        column = self.get_field_column(collection, field)
+        if column is None:
+            sorted_column = None
+        else:
+            order = np.argsort(column, kind='stable')
+            sorted_column = (column[order], order.astype(np.uint64))
+        self._column_cache[cache_key] = sorted_column
+        return sorted_column
+
+    def get_field_column(self, collection: str,
+                         field: str) -> Optional[np.ndarray]:
+        """
+        Numeric metadata field as a float64 column over point IDs 0..N-1.
+
+        Columns are built once per (collection, field) and cached; fields
+        that are not uniformly numeric are remembered as None so the
+        per-point path is taken without re-probing every query.
+        """
+        info = self.client._get_info(collection)
+        cache_key = (collection, field, info.vector_count)
+        if cache_key in self._column_cache:
+            return self._column_cache[cache_key]
+        simulated = self._simulated_column(info.vector_count, field)
+        if simulated is not None:
+            if simulated.ndim == 1 and simulated.dtype != object:
+                column = simulated.astype(np.float64)
+            else:
+                column = None
+            self._column_cache[cache_key] = column
+            return column
+        values = []
+        for pid in LazyStringRange(info.vector_count):
+            value = self._get_point_metadata(collection, pid).get(field)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                self._column_cache[cache_key] = None
+                return None
+            values.append(value)
+        column = np.asarray(values, dtype=np.float64)
+        self._column_cache[cache_key] = column
+        return column
+
+    def execute_range_vectorized(self, collection: str, field: str,
+                                 bounds: Dict[str, float]
+                                 ) -> Optional[np.ndarray]:
+        """
+        Evaluate a range predicate as whole-column numpy comparisons.
+
+        Returns a boolean mask over point IDs 0..N-1, or None when the field
+        has no numeric column and the caller must fall back to per-point
+        evaluation.
+        """
+        quantized = self.get_quantized_column(collection, field)
+        if quantized is not None:
+            # Integer compares over the quantized column scan half the
+            # bytes; bounds are cast to the grid with the matching
+            # floor/ceil so the semantics are unchanged.
+            column, scale = quantized
+            bounds = {bound: _quantize_bound(value, scale, bound)
+                      for bound, value in bounds.items()}
+        else:
+            column = self.get_field_column(collection, field)
+            if column is None:
+                return None
+        # Bound values stay exact as float64: real columns are float64
+        # already and quantized grids fit in 31 bits.
+        return range_mask(column, bounds)
+
+    # -------------------------------------------------------------------------
+    # Predicate evaluation
+    # -------------------------------------------------------------------------
+
+    def _matches(self, parsed: Dict[str, Any], metadata: Dict[str, Any],
+                 point_id: Optional[str] = None) -> bool:
+        """Evaluate one parsed node against one point's metadata."""
+        if parsed['type'] == 'boolean':
+            for child in parsed['must']:
+                if not self._matches(child, metadata, point_id):
+                    return False
+            for child in parsed['must_not']:
+                if self._matches(child, metadata, point_id):
+                    return False
+            if parsed['should']:
+                min_should = parsed.get('min_should_match', 1)
+                if min_should > 1:
+                    return sum(self._matches(child, metadata, point_id)
+                               for child in parsed['should']) >= min_should
+                return any(self._matches(child, metadata, point_id)
+                           for child in parsed['should'])
+            return True
+        if parsed['type'] == 'always_false':
+            return False
+        if parsed['type'] == 'always_true':
+            return True
+        if parsed['type'] == 'has_id':
+            # has_id can nest under boolean clauses; mirror OP_HAS_ID in
+            # the compiled programs, which also tests the point id.
+            return (point_id is not None and
+                    point_id in _frozen_ids(tuple(parsed['ids'])))
+        return self._matches_value(parsed, metadata.get(parsed['key']))
+
+    def _matches_value(self, parsed: Dict[str, Any], value: Any) -> bool:
+        """
+        Evaluate one leaf node against an already-fetched field value.
+
+        Split out of _matches so candidate scans that hold a value column
+        pay one array read per point instead of a metadata dict plus a
+        keyed lookup per leaf.
+        """
+        node_type = parsed['type']
+
+        if node_type == 'match':
+            if isinstance(value, list):
+                return parsed['value'] in value
+            return value == parsed['value']
+
+        if node_type == 'range':
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return False
+            bounds = parsed['bounds']
+            if 'gt' in bounds and not value > bounds['gt']:
+                return False
+            if 'gte' in bounds and not value >= bounds['gte']:
+                return False
+            if 'lt' in bounds and not value < bounds['lt']:
+                return False
+            if 'lte' in bounds and not value <= bounds['lte']:
+                return False
+            return True
+
+        if node_type == 'geo_radius':
+            return self._geo_within(value, parsed['lat'], parsed['lon'],
+                                    parsed['radius'])
+
+        if node_type == 'geo_bounding_box':
+            return self._bbox_within(value, parsed['top'], parsed['left'],
+                                     parsed['bottom'], parsed['right'])
+
+        if node_type == 'is_null':
+            return value is None
+
+        if node_type == 'is_empty':
+            return value is None or value == [] or value == '' or value == {}
+
+        raise VexFSError(f"Unknown filter node type: {node_type}")
+
+    def _bbox_within(self, location: Any, top: float, left: float,
+                     bottom: float, right: float) -> bool:
+        """geo_bounding_box predicate body shared with compiled filters."""
+        if not isinstance(location, dict):
+            return False
+        lat = location.get('lat')
+        lon = location.get('lon')
+        if lat is None or lon is None:
+            return False
+        if not bottom <= lat <= top:
+            return False
+        if left <= right:
+            return left <= lon <= right
+        # Box crosses the antimeridian.
+        return lon >= left or lon <= right
+
+    def _geo_within(self, location: Any, lat: float, lon: float,
+                    radius: float) -> bool:
+        """geo_radius predicate body shared with compiled filters."""
+        if not isinstance(location, dict):
+            return False
+        point_lat = location.get('lat')
+        point_lon = location.get('lon')
+        if point_lat is None or point_lon is None:
+            return False
+        clat_r, clon_r, cos_clat, a_threshold, angular_sq, equirect = \
+            _geo_constants(lat, lon, radius)
+        plat_r = math.radians(point_lat)
+        if equirect:
+            # Same flat-projection formula as the columnar kernels; the
+            # shared cutoff keeps scalar and dense verdicts identical.
+            dlat = plat_r - clat_r
+            dlon = abs(math.radians(point_lon) - clon_r)
+            if dlon > math.pi:
+                dlon = 2.0 * math.pi - dlon
+            dx = dlon * cos_clat
+            return dlat * dlat + dx * dx <= angular_sq
+        a = (math.sin((plat_r - clat_r) / 2.0) ** 2 +
+             cos_clat * math.cos(plat_r) *
+             math.sin((math.radians(point_lon) - clon_r) / 2.0) ** 2)
+        return a <= a_threshold
+
+    @staticmethod
+    def _haversine_a(lat1: float, lon1: float,
+                     lat2: float, lon2: float) -> float:
+        """Haversine "a" term — monotonic in the great-circle distance."""
+        rlat1 = math.radians(lat1)
+        rlat2 = math.radians(lat2)
+        dlat = math.radians(lat2 - lat1)
+        dlon = math.radians(lon2 - lon1)
+        return (math.sin(dlat / 2.0) ** 2 +
+                math.cos(rlat1) * math.cos(rlat2) * math.sin(dlon / 2.0) ** 2)
+
+    def _haversine_m(self, lat1: float, lon1: float,
+                     lat2: float, lon2: float) -> float:
+        """Great-circle distance between two WGS84 points in meters."""
+        a = self._haversine_a(lat1, lon1, lat2, lon2)
+        return 2.0 * _EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+    # -------------------------------------------------------------------------
+    # Metadata access
+    # -------------------------------------------------------------------------
+
+    def _get_point_metadata(self, collection: str,
+                            point_id: str) -> Dict[str, Any]:
+        """Fetch (or simulate) metadata for one point, with caching."""
+        cache_key = (collection, point_id)
+        cached = self._metadata_cache.get(cache_key)
+        if cached is None:
+            cached = self._simulate_point_metadata(point_id)
+            self._metadata_cache.put(cache_key, cached)
+        return cached
+
+    def _simulated_column(self, count: int,
+                          field: str) -> Optional[np.ndarray]:
+        """
+        Whole-collection column for one simulated metadata field.
+
+        While metadata is simulated the column builders synthesize their
+        arrays from the cached seed column directly — one numpy pass per
+        field instead of N per-point dict constructions. Returns None for
+        fields the simulator does not produce; once kernel payloads land
+        this shortcut goes away and the builders' metadata loops take over.
+        """
+        seed_key = ('_seeds', count)
+        seeds = self._column_cache.get(seed_key)
+        if seeds is None:
+            seeds = _splitmix64_column(count)
+            self._column_cache[seed_key] = seeds
+        return _simulate_field_column(seeds, field)
+
+    def _simulate_point_metadata(self, point_id: str) -> Dict[str, Any]:
+        """
+        Deterministic stand-in metadata derived from the point ID.
+
+        Used until kernel payload storage lands; the distribution is spread
+        enough to exercise every filter type. Dense numeric IDs use the
+        same splitmix64 seed as the columnar generator so both paths agree
+        value for value; non-numeric IDs fall back to md5.
+        """
+        if point_id.isdigit():
+            seed = _splitmix64(int(point_id))
+        else:
+            seed = int(hashlib.md5(point_id.encode()).hexdigest()[:16], 16)
+        return {
+            'category': _CATEGORIES[seed % 5],
+            'price': (seed % 100000) / 100.0,
+            'rating': ((seed >> 8) % 50) / 10.0,
+            'stock': (seed >> 4) % 1000,
+            'location': {
+                'lat': -90.0 + (seed % 18000) / 100.0,
+                'lon': -180.0 + ((seed >> 4) % 36000) / 100.0,
+            },
+            'tags': [_CATEGORIES[(seed >> shift) % 5] for shift in (3, 7)],
+        }
+
+    def _get_all_point_ids(self, collection: str) -> Sequence[str]:
+        """All point IDs in a collection as a lazy string view."""
+        info = self.client._get_info(collection)
+        return LazyStringRange(info.vector_count)
@@ -0,0 +1,400 @@
+"""
+Point-ID set representation for filter evaluation.
+
+Filter conditions combine large sets of point IDs with AND/OR/NOT. For the
+dense numeric IDs VexFS collections produce, a numpy-backed bitmap turns
+those combinations into word-parallel bitwise operations instead of
+per-element hashing on Python ``set[str]``. Non-numeric IDs fall back to a
+plain set transparently.
+"""
+
+from typing import Iterable, Iterator, List, Optional, Sequence, Set, Union
+
+import numpy as np
+
+try:
+    # Optional JIT for the stacked-mask reductions; numpy handles it fine
+    # without, just with slightly more temporary traffic.
+    import numba
+except ImportError:
+    numba = None
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _reduce_stacked(stacked: np.ndarray, union: bool) -> np.ndarray:
+        out = stacked[0].copy()
+        for row in range(1, stacked.shape[0]):
+            mask = stacked[row]
+            if union:
+                for i in range(out.shape[0]):
+                    out[i] |= mask[i]
+            else:
+                for i in range(out.shape[0]):
+                    out[i] &= mask[i]
+        return out
+else:
+    def _reduce_stacked(stacked: np.ndarray, union: bool) -> np.ndarray:
+        if union:
+            return np.logical_or.reduce(stacked, axis=0)
+        return np.logical_and.reduce(stacked, axis=0)
+
+
+class LazyStringRange(Sequence[str]):
+    """
+    Read-only view of the IDs ``"0".."stop-1"`` that behaves like a list of
+    strings without allocating one.
+
+    Returned for the "all points" cases so a 1M-point collection does not pay
+    ~100MB of str/set churn per unfiltered query; callers that only len(),
+    slice, iterate or membership-test never materialize anything.
+    """
+
+    __slots__ = ('_stop',)
+
+    def __init__(self, stop: int):
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop
+
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [str(i) for i in range(*index.indices(self._stop))]
+        if index < 0:
+            index += self._stop
+        if not 0 <= index < self._stop:
+            raise IndexError('point ID index out of range')
+        return str(index)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(str, range(self._stop))
+
+    def __contains__(self, pid: object) -> bool:
+        return (isinstance(pid, str) and pid.isdigit() and
+                int(pid) < self._stop)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyStringRange):
+            return self._stop == other._stop
+        if isinstance(other, (list, tuple)):
+            return len(other) == self._stop and list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'LazyStringRange({self._stop})'
+
+
+def _reduce(sets: 'List[PointIdSet]', union: bool) -> 'PointIdSet':
+    if not sets:
+        return PointIdSet.empty()
+    if len(sets) == 1:
+        return sets[0].copy()
+    for point_set in sets:
+        point_set._promote()
+    if all(point_set._mask is not None for point_set in sets):
+        size = max(point_set._mask.shape[0] for point_set in sets)
+        stacked = np.zeros((len(sets), size), dtype=bool)
+        for row, point_set in enumerate(sets):
+            mask = point_set._mask
+            stacked[row, :mask.shape[0]] = mask
+        return PointIdSet(mask=_reduce_stacked(stacked, union))
+    result = sets[0].copy()
+    for point_set in sets[1:]:
+        if union:
+            result |= point_set
+        else:
+            result &= point_set
+    return result
+
+
+def reduce_or(sets: 'List[PointIdSet]') -> 'PointIdSet':
+    """Union many sets in one stacked reduction instead of pairwise folds."""
+    return _reduce(sets, union=True)
+
+
+def reduce_and(sets: 'List[PointIdSet]') -> 'PointIdSet':
+    """Intersect many sets in one stacked reduction."""
+    return _reduce(sets, union=False)
+
+
+def reduce_at_least(sets: 'List[PointIdSet]', k: int) -> 'PointIdSet':
+    """
+    IDs present in at least ``k`` of the sets.
+
+    On the bitmap path this is an int8 tally — one vectorized add per set
+    viewing each bool mask as int8, then a single threshold compare — so
+    min_should_match semantics cost barely more than a plain union. The
+    tally widens to int16 past 127 sets; mixed representations fall back
+    to per-ID counting.
+    """
+    if k <= 1:
+        return _reduce(sets, union=True)
+    if k > len(sets):
+        return PointIdSet.empty()
+    for point_set in sets:
+        point_set._promote()
+    if all(point_set._mask is not None for point_set in sets):
+        size = max(point_set._mask.shape[0] for point_set in sets)
+        dtype = np.int8 if len(sets) <= 127 else np.int16
+        tally = np.zeros(size, dtype=dtype)
+        for point_set in sets:
+            mask = point_set._mask
+            tally[:mask.shape[0]] += mask.view(np.int8)
+        return PointIdSet(mask=tally >= k)
+    counts: dict = {}
+    for point_set in sets:
+        for pid in point_set:
+            counts[pid] = counts.get(pid, 0) + 1
+    return PointIdSet(fallback={pid for pid, seen in counts.items()
+                                if seen >= k})
+
+
+class IdBloom:
+    """
+    Compact Bloom filter over point IDs for constant-time negative lookups.
+
+    has_id filters often name IDs that are not in the collection at all;
+    membership here is a couple of bit tests against a numpy uint64 word
+    array (~8 bits per ID), with no metadata access. False positives just
+    fall through to the exact filter path.
+    """
+
+    __slots__ = ('_words', '_mask')
+
+    def __init__(self, ids: Iterable[str], capacity: int):
+        # ~8 bits per expected ID, power-of-two sized for mask indexing.
+        bits = 1 << max(10, (capacity * 8 - 1).bit_length())
+        self._mask = bits - 1
+        self._words = np.zeros(bits >> 6, dtype=np.uint64)
+        words = self._words
+        mask = self._mask
+        for pid in ids:
+            h1, h2 = self._hashes(pid)
+            for h in (h1 & mask, h2 & mask):
+                words[h >> 6] |= np.uint64(1 << (h & 63))
+
+    @staticmethod
+    def _hashes(pid: str) -> 'tuple[int, int]':
+        h = hash(pid) & 0xFFFFFFFFFFFFFFFF
+        # Second hash derived by a 64-bit mix so the two probes are
+        # independent without hashing the string twice.
+        h2 = (h ^ (h >> 33)) * 0xFF51AFD7ED558CCD & 0xFFFFFFFFFFFFFFFF
+        return h, h2 ^ (h2 >> 29)
+
+    def __contains__(self, pid: str) -> bool:
+        h1, h2 = self._hashes(pid)
+        words = self._words
+        mask = self._mask
+        for h in (h1 & mask, h2 & mask):
+            if not (int(words[h >> 6]) >> (h & 63)) & 1:
+                return False
+        return True
+
+
+class PointIdSet:
+    """
+    Set of point IDs backed by a dense boolean bitmap when IDs are numeric.
+
+    The bitmap covers IDs ``0..size-1``; AND/OR/DIFFERENCE are vectorized
+    numpy operations combining 8 IDs per byte (SIMD-widened by numpy).
+    String IDs that are not decimal integers are kept in a fallback
+    ``set[str]`` with ordinary set algebra.
+    """
+
+    __slots__ = ('_mask', '_fallback')
+
+    def __init__(self, mask: Optional[np.ndarray] = None,
+                 fallback: Optional[Set[str]] = None):
+        self._mask = mask
+        self._fallback = fallback
+
+    # -------------------------------------------------------------------------
+    # Constructors
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def from_range(cls, count: int) -> 'PointIdSet':
+        """Dense set covering IDs 0..count-1 without iterating them."""
+        return cls(mask=np.ones(count, dtype=bool))
+
+    @classmethod
+    def empty(cls, count: int = 0) -> 'PointIdSet':
+        return cls(mask=np.zeros(count, dtype=bool))
+
+    @classmethod
+    def from_indices(cls, indices: np.ndarray, size: int) -> 'PointIdSet':
+        """Build a set from integer point indices with a known extent."""
+        mask = np.zeros(size, dtype=bool)
+        mask[indices] = True
+        return cls(mask=mask)
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[Union[str, int]],
+                 size: Optional[int] = None) -> 'PointIdSet':
+        """
+        Build a set from explicit IDs; numeric IDs go into a bitmap, any
+        non-numeric ID switches the whole set to the fallback representation.
+        """
+        numeric: List[int] = []
+        for pid in ids:
+            if isinstance(pid, int):
+                numeric.append(pid)
+            elif isinstance(pid, str) and pid.isdigit():
+                numeric.append(int(pid))
+            else:
+                return cls(fallback={str(i) for i in ids})
+        if not numeric:
+            return cls(mask=np.zeros(size or 0, dtype=bool))
+        extent = max(size or 0, max(numeric) + 1)
+        mask = np.zeros(extent, dtype=bool)
+        mask[numeric] = True
+        return cls(mask=mask)
+
+    # -------------------------------------------------------------------------
+    # Set algebra (in-place, word-parallel on the bitmap path)
+    # -------------------------------------------------------------------------
+
+    def _promote(self) -> None:
+        """
+        Switch an all-numeric fallback set to the bitmap representation.
+
+        Mixed-representation algebra otherwise degrades both operands to
+        hashed string sets; promoting first keeps the combination on the
+        vectorized word-parallel path whenever the IDs allow it.
+        """
+        fallback = self._fallback
+        if self._mask is not None or fallback is None:
+            return
+        if not all(pid.isdigit() for pid in fallback):
+            return
+        if fallback:
+            indices = np.fromiter(map(int, fallback), dtype=np.int64,
+                                  count=len(fallback))
+            mask = np.zeros(int(indices.max()) + 1, dtype=bool)
+            mask[indices] = True
+        else:
+            mask = np.zeros(0, dtype=bool)
+        self._mask = mask
+        self._fallback = None
+
+    def _aligned(self, other: 'PointIdSet') -> 'tuple[np.ndarray, np.ndarray]':
+        a, b = self._mask, other._mask
+        if a.shape[0] < b.shape[0]:
+            a = np.concatenate([a, np.zeros(b.shape[0] - a.shape[0], bool)])
+        elif b.shape[0] < a.shape[0]:
+            b = np.concatenate([b, np.zeros(a.shape[0] - b.shape[0], bool)])
+        return a, b
+
+    def __iand__(self, other: 'PointIdSet') -> 'PointIdSet':
+        if self._mask is None or other._mask is None:
+            self._promote()
+            other._promote()
+        if self._mask is not None and other._mask is not None:
+            a, b = self._aligned(other)
+            self._mask = a & b
+        else:
+            self._fallback = self.to_string_set() & other.to_string_set()
+            self._mask = None
+        return self
+
+    def __ior__(self, other: 'PointIdSet') -> 'PointIdSet':
+        if self._mask is None or other._mask is None:
+            self._promote()
+            other._promote()
+        if self._mask is not None and other._mask is not None:
+            a, b = self._aligned(other)
+            self._mask = a | b
+        else:
+            self._fallback = self.to_string_set() | other.to_string_set()
+            self._mask = None
+        return self
+
+    def __isub__(self, other: 'PointIdSet') -> 'PointIdSet':
+        if self._mask is None or other._mask is None:
+            self._promote()
+            other._promote()
+        if self._mask is not None and other._mask is not None:
+            a, b = self._aligned(other)
+            self._mask = a & ~b
+        else:
+            self._fallback = self.to_string_set() - other.to_string_set()
+            self._mask = None
+        return self
+
+    def __and__(self, other: 'PointIdSet') -> 'PointIdSet':
+        return self.copy().__iand__(other)
+
+    def __or__(self, other: 'PointIdSet') -> 'PointIdSet':
+        return self.copy().__ior__(other)
+
+    def __sub__(self, other: 'PointIdSet') -> 'PointIdSet':
+        return self.copy().__isub__(other)
+
+    def complement(self, size: int) -> 'PointIdSet':
+        """
+        IDs ``0..size-1`` not in this set.
+
+        On the bitmap path this is one vectorized invert; the all-points
+        universe is never allocated, so ``universe - X`` style negation
+        costs the same as evaluating X itself. The fallback path (IDs that
+        are not all numeric) builds the dense universe and subtracts.
+        """
+        self._promote()
+        mask = self._mask
+        if mask is not None:
+            if mask.shape[0] < size:
+                mask = np.concatenate(
+                    [mask, np.zeros(size - mask.shape[0], bool)])
+            return PointIdSet(mask=~mask[:size])
+        result = PointIdSet.from_range(size)
+        result -= self
+        return result
+
+    def copy(self) -> 'PointIdSet':
+        if self._mask is not None:
+            return PointIdSet(mask=self._mask.copy())
+        return PointIdSet(fallback=set(self._fallback or ()))
+
+    # -------------------------------------------------------------------------
+    # Introspection / conversion
+    # -------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if self._mask is not None:
+            return int(np.count_nonzero(self._mask))
+        return len(self._fallback or ())
+
+    def __bool__(self) -> bool:
+        if self._mask is not None:
+            return bool(self._mask.any())
+        return bool(self._fallback)
+
+    def __contains__(self, pid: Union[str, int]) -> bool:
+        if self._mask is not None:
+            try:
+                idx = int(pid)
+            except (TypeError, ValueError):
+                return False
+            return 0 <= idx < self._mask.shape[0] and bool(self._mask[idx])
+        return str(pid) in (self._fallback or ())
+
+    def __iter__(self) -> Iterator[str]:
+        if self._mask is not None:
+            return (str(i) for i in np.nonzero(self._mask)[0])
+        return iter(self._fallback or ())
+
+    def to_string_set(self) -> Set[str]:
+        if self._mask is not None:
+            return {str(i) for i in np.nonzero(self._mask)[0]}
+        return set(self._fallback or ())
+
+    def to_string_list(self) -> Sequence[str]:
+        """
+        String IDs for the API boundary. The dense all-set case returns a
+        LazyStringRange view instead of materializing every ID.
+        """
+        if self._mask is not None:
+            if self._mask.all():
+                return LazyStringRange(self._mask.shape[0])
+            return [str(i) for i in np.nonzero(self._mask)[0]]
+        return list(self._fallback or ())